@@ -2,9 +2,13 @@ import csv
 import datetime
 import os
 
+import numpy as np
+
 from fsm_gen.case_studies import *
+from fsm_gen.equivalence import are_equivalent
 from fsm_gen.mutator import Mutator
-from walks.hsi import generate_harmonised_state_identifiers, generate_HSI_suite
+from fsm_gen.seeding import spawn_seeds, task_rngs
+from walks.cache import hsi_cache
 from walks.random_walk import RandomWalk
 
 FILENAME = (
@@ -13,7 +17,11 @@ FILENAME = (
 
 
 def write_to_csv(
-    case_study: FSMGenerator, percent: int, walk_type: RandomWalk.WalkType, result: dict
+    case_study: FSMGenerator,
+    percent: int,
+    walk_type: RandomWalk.WalkType,
+    seed: int,
+    result: dict,
 ) -> None:
     """
     Write the results of the walk to a CSV file.
@@ -21,6 +29,7 @@ def write_to_csv(
         case_study (FSMGenerator): The FSM the walk was performed on.
         percent (int): The percentage of the FSM covered.
         walk_type (RandomWalk.WalkType): The type of walk performed.
+        seed (int): The seed the walk was run with.
         result (dict): The results of the walk.
     """
     with open(FILENAME, mode="a", newline="") as f:
@@ -35,54 +44,81 @@ def write_to_csv(
                 result["walk_len"],
                 result["detected_fault_index"],
                 result["time_taken"],
+                result["equivalent_mutant"],
+                seed,
             ]
         )
 
 
 def run_walk(
-    case_study: FSMGenerator, percent: int, walk_type: RandomWalk.WalkType
+    case_study: FSMGenerator,
+    percents: list[int],
+    walk_type: RandomWalk.WalkType,
+    seed: int,
 ) -> None:
     """
-    Run a walk on the given case study and write the results to a CSV file.
+    Run a walk on the given case study and write the results at each coverage percentage it
+    passes to a CSV file.
+    The rows of the results can be replayed by calling this with the same arguments and seed.
     Args:
         case_study (FSMGenerator): The FSM to run the walk on.
-        percent (int): The percentage of the FSM to cover.
+        percents (list[int]): The percentages of the FSM to cover.
         walk_type (RandomWalk.WalkType): The type of walk to perform.
+        seed (int): The seed for the mutator and walk.
     """
+    _, mutator_rng, walk_rng = task_rngs(seed)
+
+    # The artefacts are cached, so the walker reuses the state identifiers computed here
+    artefacts = hsi_cache.get(case_study)
+
     len_state_identifiers = 0
-    state_identifiers = generate_harmonised_state_identifiers(case_study)
-    for set in state_identifiers.values():
+    for set in artefacts["state_identifiers"].values():
         for seq in set:
             len_state_identifiers += len(seq)
 
-    hsi_suite = generate_HSI_suite(case_study, state_identifiers)
+    hsi_suite = artefacts["hsi_suite"]
 
-    mutator = Mutator(case_study)
+    mutator = Mutator(case_study, rng=mutator_rng)
     mutated_fsm = mutator.create_mutated_fsm()
+    equivalent_mutant = are_equivalent(case_study, mutated_fsm)
 
-    walker = RandomWalk(case_study, mutated_fsm, percent, hsi_suite)
+    walker = RandomWalk(case_study, mutated_fsm, percents, hsi_suite, rng=walk_rng)
 
+    # A mutant that behaves the same as the original can never be detected, so don't walk on it
+    # and leave its walk length empty (-1 means the maximum walk length was exceeded).
+    # A single walk to the highest percentage records the lower ones on the way.
     start_time = datetime.datetime.now()
-    walk = walker.walk(walk_type)
+    if not equivalent_mutant:
+        milestones = walker.walk_milestones(walk_type)
+    else:
+        milestones = {
+            percent: {"walk_len": None, "detected_fault_index": None}
+            for percent in walker.target_coverages
+        }
     end_time = datetime.datetime.now()
-    detected_fault = walker.detected_fault(walk)
 
-    results = {
-        "sum_hi": len_state_identifiers,
-        "hsi_len": len(hsi_suite),
-        "walk_len": len(walk) if type(walk) == list else walk,
-        "detected_fault_index": detected_fault,
-        "time_taken": end_time - start_time,
-    }
+    for percent, milestone in milestones.items():
+        results = {
+            "sum_hi": len_state_identifiers,
+            "hsi_len": len(hsi_suite),
+            "walk_len": milestone["walk_len"],
+            "detected_fault_index": milestone["detected_fault_index"],
+            "time_taken": end_time - start_time,
+            "equivalent_mutant": equivalent_mutant,
+        }
 
-    write_to_csv(str(case_study), percent, walk_type, results)
+        write_to_csv(str(case_study), percent, walk_type, seed, results)
 
 
-def main():
+def main(seed: int = None):
     """
     Run in terminal:
     python3 case_study_experiments.py
+
+    Args:
+        seed (int): The seed to derive the seed of every walk from.
     """
+    seed_sequence = np.random.SeedSequence(seed)
     percent_coverage = [80, 90, 95, 100]
     case_studies = [CoffeeMachine(), LocalisationSystem(), Phone()]
 
@@ -101,14 +137,20 @@ def main():
                 "Walk Length",
                 "Detected Fault Index",
                 "Time Taken",
+                "Equivalent Mutant",
+                "Seed",
             ]
         )
 
     for case_study in case_studies:
         for _ in range(20):
             for walk_type in RandomWalk.WalkType:
-                for percent in percent_coverage:
-                    run_walk(case_study, percent, walk_type)
+                run_walk(
+                    case_study,
+                    percent_coverage,
+                    walk_type,
+                    spawn_seeds(seed_sequence, 1)[0],
+                )
 
 
 if __name__ == "__main__":
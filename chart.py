@@ -11,6 +11,8 @@ walk_type_mapping = {
 }
 
 df = pd.read_csv("results/data.csv")
+# Equivalent mutants are not walked, and -1 marks walks that exceeded the maximum length
+df = df[~df["Equivalent Mutant"]]
 df = df[df["Walk Length"] != -1]
 df["Walk Type"] = df["Walk Type"].map(walk_type_mapping)
 
@@ -2,9 +2,13 @@ import csv
 import datetime
 import os
 
+import numpy as np
+
 from fsm_gen.generator import FSMGenerator
+from fsm_gen.equivalence import are_equivalent
 from fsm_gen.mutator import Mutator
-from walks.hsi import generate_harmonised_state_identifiers, generate_HSI_suite
+from fsm_gen.seeding import spawn_seeds, task_rngs
+from walks.cache import hsi_cache
 from walks.random_walk import RandomWalk
 
 FILENAME = f"results/{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
@@ -16,6 +20,7 @@ def write_to_csv(
     output_size: int,
     percent: int,
     walk_type: RandomWalk.WalkType,
+    seed: int,
     result: dict,
 ) -> None:
     """
@@ -26,6 +31,7 @@ def write_to_csv(
         output_size (int): The number of outputs in the FSM.
         percent (int): The percentage of the FSM to cover.
         walk_type (RandomWalk.WalkType): The type of walk performed.
+        seed (int): The seed the walk was run with.
         result (dict): The results of the walk.
     """
     with open(FILENAME, mode="a", newline="") as f:
@@ -42,6 +48,8 @@ def write_to_csv(
                 result["walk_len"],
                 result["detected_fault_index"],
                 result["time_taken"],
+                result["equivalent_mutant"],
+                seed,
             ]
         )
 
@@ -50,56 +58,80 @@ def run_walk(
     state_size: int,
     input_size: int,
     output_size: int,
-    percent: int,
+    percents: list[int],
     walk_type: RandomWalk.WalkType,
+    seed: int,
 ) -> None:
     """
-    Run a walk on the FSM and record the results.
+    Run a walk on the FSM and record the results at each coverage percentage it passes.
+    The rows of the results can be replayed by calling this with the same arguments and seed.
     Args:
         state_size (int): The number of states in the FSM.
         input_size (int): The number of inputs in the FSM.
         output_size (int): The number of outputs in the FSM.
-        percent (int): The percentage of the FSM to cover.
+        percents (list[int]): The percentages of the FSM to cover.
         walk_type (RandomWalk.WalkType): The type of walk to perform.
+        seed (int): The seed for the FSM generator, mutator and walk.
     """
-    fsm = FSMGenerator(state_size, input_size, output_size)
-    while len(fsm.states) == 1:
-        fsm = FSMGenerator(state_size, input_size, output_size)
+    generator_rng, mutator_rng, walk_rng = task_rngs(seed)
+
+    fsm = FSMGenerator(
+        state_size, input_size, output_size, exact_size=True, rng=generator_rng
+    )
+
+    # The artefacts are cached, so the walker reuses the state identifiers computed here
+    artefacts = hsi_cache.get(fsm)
 
     len_state_identifiers = 0
-    state_identifiers = generate_harmonised_state_identifiers(fsm)
-    for set in state_identifiers.values():
+    for set in artefacts["state_identifiers"].values():
         for seq in set:
             len_state_identifiers += len(seq)
 
-    hsi_suite = generate_HSI_suite(fsm, state_identifiers)
+    hsi_suite = artefacts["hsi_suite"]
 
-    mutator = Mutator(fsm)
+    mutator = Mutator(fsm, rng=mutator_rng)
     mutated_fsm = mutator.create_mutated_fsm()
+    equivalent_mutant = are_equivalent(fsm, mutated_fsm)
 
-    walker = RandomWalk(fsm, mutated_fsm, percent, hsi_suite)
+    walker = RandomWalk(fsm, mutated_fsm, percents, hsi_suite, rng=walk_rng)
 
+    # A mutant that behaves the same as the original can never be detected, so don't walk on it
+    # and leave its walk length empty (-1 means the maximum walk length was exceeded).
+    # A single walk to the highest percentage records the lower ones on the way.
     start_time = datetime.datetime.now()
-    walk = walker.walk(walk_type)
+    if not equivalent_mutant:
+        milestones = walker.walk_milestones(walk_type)
+    else:
+        milestones = {
+            percent: {"walk_len": None, "detected_fault_index": None}
+            for percent in walker.target_coverages
+        }
     end_time = datetime.datetime.now()
-    detected_fault = walker.detected_fault(walk)
 
-    results = {
-        "sum_hi": len_state_identifiers,
-        "hsi_len": len(hsi_suite),
-        "walk_len": len(walk) if type(walk) == list else walk,
-        "detected_fault_index": detected_fault,
-        "time_taken": end_time - start_time,
-    }
-
-    write_to_csv(state_size, input_size, output_size, percent, walk_type, results)
+    for percent, milestone in milestones.items():
+        results = {
+            "sum_hi": len_state_identifiers,
+            "hsi_len": len(hsi_suite),
+            "walk_len": milestone["walk_len"],
+            "detected_fault_index": milestone["detected_fault_index"],
+            "time_taken": end_time - start_time,
+            "equivalent_mutant": equivalent_mutant,
+        }
+
+        write_to_csv(
+            state_size, input_size, output_size, percent, walk_type, seed, results
+        )
 
 
-def main():
+def main(seed: int = None):
     """
     Run in terminal:
     python3 experiments.py
+
+    Args:
+        seed (int): The seed to derive the seed of every walk from.
     """
+    seed_sequence = np.random.SeedSequence(seed)
     state_sizes = [5, 10, 20, 40]
     size_multipliers = {"2": 2, "n/2": 0.5, "n": 1, "2n": 2}
     percent_coverage = [80, 90, 95, 100]
@@ -121,6 +153,8 @@ def main():
                 "Walk Length",
                 "Detected Fault Index",
                 "Time Taken",
+                "Equivalent Mutant",
+                "Seed",
             ]
         )
 
@@ -147,10 +181,14 @@ def main():
 
                 for _ in range(10):
                     for walk_type in RandomWalk.WalkType:
-                        for percent in percent_coverage:
-                            run_walk(
-                                state_size, input_size, output_size, percent, walk_type
-                            )
+                        run_walk(
+                            state_size,
+                            input_size,
+                            output_size,
+                            percent_coverage,
+                            walk_type,
+                            spawn_seeds(seed_sequence, 1)[0],
+                        )
 
 
 if __name__ == "__main__":
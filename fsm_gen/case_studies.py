@@ -1,5 +1,4 @@
 from fsm_gen.generator import FSMGenerator
-from fsm_gen.machine import Machine
 
 
 class CoffeeMachine(FSMGenerator):
@@ -40,14 +39,6 @@ class CoffeeMachine(FSMGenerator):
             {"trigger": "R / t", "source": "S5", "dest": "S0"},
         ]
 
-        self.machine = Machine(
-            states=self.states,
-            initial=self.states[0],
-            graph_engine="pygraphviz",
-            auto_transitions=False,
-            transitions=self.transitions,
-        )
-
     def __str__(self):
         return "Coffee Machine"
 
@@ -77,14 +68,6 @@ class LocalisationSystem(FSMGenerator):
             {"trigger": "E / a", "source": "S0", "dest": "S2"},
         ]
 
-        self.machine = Machine(
-            states=self.states,
-            initial=self.states[0],
-            graph_engine="pygraphviz",
-            auto_transitions=False,
-            transitions=self.transitions,
-        )
-
     def __str__(self):
         return "Localisation System"
 
@@ -125,13 +108,5 @@ class Phone(FSMGenerator):
             {"trigger": "D / v", "source": "S2", "dest": "S0"},
         ]
 
-        self.machine = Machine(
-            states=self.states,
-            initial=self.states[0],
-            graph_engine="pygraphviz",
-            auto_transitions=False,
-            transitions=self.transitions,
-        )
-
     def __str__(self):
         return "Phone"
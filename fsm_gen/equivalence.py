@@ -0,0 +1,100 @@
+import numpy as np
+
+from fsm_gen.generator import FSMGenerator
+
+
+def find_distinguishing_sequence(
+    fsm1: FSMGenerator, fsm2: FSMGenerator, state1: int = 0, state2: int = 0
+) -> list[int] | None:
+    """
+    Search the product of two machines breadth-first, one level of state pairs at a time, for the
+    shortest input sequence they respond to differently. Both machines must share their event and
+    output indices, as a mutant and its original FSM do. An undefined transition produces no output
+    and leaves the machine in the same state.
+
+    Args:
+        fsm1 (FSMGenerator): the first machine.
+        fsm2 (FSMGenerator): the second machine.
+        state1 (int): the index of the state to start from in the first machine.
+        state2 (int): the index of the state to start from in the second machine.
+
+    Returns:
+        list[int] | None: the lexicographically smallest of the shortest distinguishing sequences
+        as event indices, or None if the machines are equivalent from the given states.
+    """
+    num_states2 = len(fsm2.states)
+    num_events = len(fsm1.events)
+    num_pairs = len(fsm1.states) * num_states2
+
+    # Pairs are numbered state1 * num_states2 + state2
+    parent = np.full(num_pairs, -1, np.int64)
+    parent_event = np.full(num_pairs, -1, np.int32)
+    visited = np.zeros(num_pairs, bool)
+    start = state1 * num_states2 + state2
+    visited[start] = True
+    frontier = np.array([start], np.int64)
+
+    while len(frontier):
+        states1, states2 = np.divmod(frontier, num_states2)
+        differs = fsm1.output_table[states1] != fsm2.output_table[states2]
+
+        # The frontier is in lexicographic order of paths, so the first difference is the smallest
+        if differs.any():
+            row, event = np.argwhere(differs)[0].tolist()
+            return _trace_path(parent, parent_event, int(frontier[row])) + [event]
+
+        dests1 = fsm1.dest_table[states1]
+        dests1 = np.where(dests1 == -1, states1[:, None], dests1)
+        dests2 = fsm2.dest_table[states2]
+        dests2 = np.where(dests2 == -1, states2[:, None], dests2)
+
+        pairs = (dests1.astype(np.int64) * num_states2 + dests2).ravel()
+        new = ~visited[pairs]
+        pairs = pairs[new]
+        _, first = np.unique(pairs, return_index=True)
+        first = np.sort(first)
+
+        # Record each new pair against the first pair and event that reached it
+        origins = np.flatnonzero(new)[first]
+        next_frontier = pairs[first]
+        visited[next_frontier] = True
+        parent[next_frontier] = frontier[origins // num_events]
+        parent_event[next_frontier] = origins % num_events
+        frontier = next_frontier
+
+    return None
+
+
+def _trace_path(parent: np.ndarray, parent_event: np.ndarray, pair: int) -> list[int]:
+    """
+    Follow the parent pointers of the search back to the starting pair.
+
+    Args:
+        parent (np.ndarray): the pair each pair was first reached from, -1 for the starting pair.
+        parent_event (np.ndarray): the event each pair was first reached with.
+        pair (int): the pair to trace the path to.
+
+    Returns:
+        list[int]: the event indices leading from the starting pair to the given pair.
+    """
+    path = []
+
+    while parent[pair] != -1:
+        path.append(int(parent_event[pair]))
+        pair = int(parent[pair])
+
+    return path[::-1]
+
+
+def are_equivalent(fsm1: FSMGenerator, fsm2: FSMGenerator) -> bool:
+    """
+    Determine whether two machines respond the same to every input sequence from their initial states.
+
+    Args:
+        fsm1 (FSMGenerator): the first machine.
+        fsm2 (FSMGenerator): the second machine.
+
+    Returns:
+        bool: Whether or not the machines are equivalent.
+    """
+    return find_distinguishing_sequence(fsm1, fsm2) is None
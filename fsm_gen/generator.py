@@ -1,7 +1,11 @@
 import pickle
 import random
+from collections import defaultdict
 from pathlib import Path
 
+import numpy as np
+
+from fsm_gen.graph import strongly_connected_components
 from fsm_gen.machine import Machine
 
 
@@ -12,36 +16,259 @@ class FSMGenerator:
     - The FSM is connected, meaning that all states are reachable from any other state.
     - The FSM is deterministic, meaning that there is only one transition for each event from a given state.
     - The FSM is minimal, meaning that there are no redundant states or transitions.
+
+    Transitions are stored in two dense (num_states x num_inputs) integer tables, holding the index
+    of the destination state and of the output symbol for every state/input pair (-1 if undefined).
+    The `transitions` list of dictionaries is generated from these tables.
     """
 
-    def __init__(self, num_states: int, num_inputs: int, num_outputs: int) -> None:
+    def __init__(
+        self,
+        num_states: int,
+        num_inputs: int,
+        num_outputs: int,
+        constructive: bool = False,
+        exact_size: bool = False,
+        rng: random.Random = None,
+    ) -> None:
         """
         Create a finite state machine with a given number of states and inputs.
 
         Args:
             num_states (int): the number of inputs that can be attempted at any state.
             num_inputs (int): the number of states that are in the FSM.
+            constructive (bool): build the transitions around a random cycle through every state, so
+                the machine is connected without regenerating rejected transitions.
+            exact_size (bool): repair or regenerate the machine until no states are removed when it is
+                made minimal, so it has exactly num_states states.
+            rng (random.Random): the random number generator to generate the machine with.
         """
         self.states = [f"S{i}" for i in range(num_states)]
         self.events = [f"{chr(i + 65)}" for i in range(num_inputs)]
         self.outputs = [f"{chr(i + 128512)}" for i in range(num_outputs)]
+        self.constructive = constructive
+        self.exact_size = exact_size
+        self.rng = rng if rng is not None else random.Random()
+
+        if num_states < 1:
+            raise IndexError("A machine needs at least one state to start from")
+        if exact_size and num_states > 1 and num_outputs < 2:
+            raise ValueError("A minimal machine with multiple states needs 2+ outputs")
 
         self._try_generate_connected_machine()
 
+    @property
+    def machine(self) -> Machine:
+        """
+        The graph machine of the FSM, built from the transition table on first access.
+
+        Returns:
+            Machine: A machine with the states and transitions of the FSM.
+        """
+        if getattr(self, "_machine", None) is None:
+            self._machine = self._build_machine()
+
+        return self._machine
+
+    @machine.setter
+    def machine(self, machine: Machine) -> None:
+        """
+        Replace the graph machine of the FSM. Set to None to rebuild it on next access.
+
+        Args:
+            machine (Machine): The machine to use.
+        """
+        self._machine = machine
+
+    def __getstate__(self) -> dict:
+        """
+        Leave the graph machine out when the FSM is pickled or copied, it is rebuilt on demand.
+
+        Returns:
+            dict: The attributes of the FSM.
+        """
+        state = self.__dict__.copy()
+        state["_machine"] = None
+        return state
+
+    @classmethod
+    def from_table(
+        cls,
+        states: list[str],
+        events: list[str],
+        outputs: list[str],
+        dest_table: np.ndarray,
+        output_table: np.ndarray,
+    ) -> "FSMGenerator":
+        """
+        Create a machine directly from a transition table, without generating one.
+
+        Args:
+            states (list[str]): The names of the states, the first one being the initial state.
+            events (list[str]): The names of the events.
+            outputs (list[str]): The output symbols.
+            dest_table (np.ndarray): The destination state index of each state and event.
+            output_table (np.ndarray): The output index of each state and event.
+
+        Returns:
+            FSMGenerator: A machine with the given transition table.
+        """
+        fsm = cls.__new__(cls)
+        fsm.states = list(states)
+        fsm.events = list(events)
+        fsm.outputs = list(outputs)
+        fsm.dest_table = dest_table
+        fsm.output_table = output_table
+        fsm._build_indices()
+        return fsm
+
+    @property
+    def transitions(self) -> list:
+        """
+        The transitions of the machine, generated from the transition table.
+
+        Returns:
+            list: A list of dictionaries representing the transitions.
+        """
+        transitions = []
+
+        for source, dest_row in enumerate(self.dest_table.tolist()):
+            for event, dest in enumerate(dest_row):
+                if dest != -1:
+                    transitions.append(self._get_transition(source, event))
+
+        return transitions
+
+    @transitions.setter
+    def transitions(self, transitions: list) -> None:
+        """
+        Rebuild the transition table from a list of transitions.
+
+        Args:
+            transitions (list): A list of dictionaries representing the transitions.
+        """
+        self._machine = None
+        self._build_indices()
+        self.dest_table = np.full((len(self.states), len(self.events)), -1, np.int32)
+        self.output_table = np.full((len(self.states), len(self.events)), -1, np.int32)
+
+        for transition in transitions:
+            event, output = transition["trigger"].split(" / ")
+
+            if transition["source"] not in self._state_index:
+                raise ValueError(f"Invalid state: '{transition['source']}'")
+            if transition["dest"] not in self._state_index:
+                raise ValueError(f"Invalid state: '{transition['dest']}'")
+            if event not in self._event_index:
+                raise ValueError(f"Invalid event: '{event}'")
+
+            source = self._state_index[transition["source"]]
+            event = self._event_index[event]
+            dest = self._state_index[transition["dest"]]
+            output = self._output_id(output)
+
+            if self.dest_table[source, event] != -1 and (
+                self.dest_table[source, event] != dest
+                or self.output_table[source, event] != output
+            ):
+                raise ValueError(
+                    f"Non-deterministic transition for state '{transition['source']}' "
+                    f"with trigger '{transition['trigger']}'"
+                )
+
+            self._set_transition(source, event, dest, output)
+
+    def _build_indices(self) -> None:
+        """
+        Map the names of the states, events and outputs to their index in the transition table.
+        """
+        self._state_index = {state: i for i, state in enumerate(self.states)}
+        self._event_index = {event: i for i, event in enumerate(self.events)}
+        self._output_index = {output: i for i, output in enumerate(self.outputs)}
+
+    def _output_id(self, output: str) -> int:
+        """
+        Get the index of an output symbol, adding it to the outputs if it is not already known.
+
+        Args:
+            output (str): The output symbol.
+
+        Returns:
+            int: The index of the output symbol.
+        """
+        if output not in self._output_index:
+            self._output_index[output] = len(self.outputs)
+            self.outputs.append(output)
+
+        return self._output_index[output]
+
+    def _set_transition(self, source: int, event: int, dest: int, output: int) -> None:
+        """
+        Set the destination and output of a transition in the transition table.
+
+        Args:
+            source (int): The index of the source state.
+            event (int): The index of the event.
+            dest (int): The index of the destination state.
+            output (int): The index of the output symbol.
+        """
+        self.dest_table[source, event] = dest
+        self.output_table[source, event] = output
+
+    def _get_transition(self, source: int, event: int) -> dict:
+        """
+        Get a transition from the transition table as a dictionary.
+
+        Args:
+            source (int): The index of the source state.
+            event (int): The index of the event.
+
+        Returns:
+            dict: The transition for the given source state and event.
+        """
+        return {
+            "trigger": f"{self.events[event]} / {self.outputs[self.output_table[source, event]]}",
+            "source": self.states[source],
+            "dest": self.states[self.dest_table[source, event]],
+        }
+
     def _try_generate_connected_machine(self) -> None:
         """
         Try to generate a connected machine. If the machine is not connected, try again.
+        The number of rejected sets of transitions is stored in `retries`.
         """
-        connected = False
+        self.retries = 0
+
+        while True:
+            if self.constructive:
+                self._generate_connected_transitions()
+            else:
+                connected = False
+
+                while not connected:
+                    self.transitions = self._generate_transitions()
+                    connected = self._ensure_connected_machine()
 
-        while not connected:
-            self.transitions = self._generate_transitions()
-            connected = self._ensure_connected_machine()
+                    if not connected:
+                        self.retries += 1
+
+            self._add_leftover_transitions()
+
+            if not self.exact_size or self._separate_equivalent_states():
+                break
+
+            self.retries += 1
 
-        self._add_leftover_transitions()
         self._make_minimal()
-        self._cleanup_transitions()
-        self.machine = Machine(
+
+    def _build_machine(self) -> Machine:
+        """
+        Build a graph machine from the transition table, for drawing.
+
+        Returns:
+            Machine: A machine with the states and transitions of the FSM.
+        """
+        return Machine(
             states=self.states,
             initial=self.states[0],
             graph_engine="pygraphviz",
@@ -59,13 +286,13 @@ class FSMGenerator:
         transitions = []
 
         for state in self.states:
-            events = random.sample(self.events, len(self.events) - 1)
+            events = self.rng.sample(self.events, len(self.events) - 1)
             for event in events:
-                dest = random.choice(self.states)
+                dest = self.rng.choice(self.states)
 
                 transitions.append(
                     {
-                        "trigger": event + " / " + random.choice(self.outputs),
+                        "trigger": event + " / " + self.rng.choice(self.outputs),
                         "source": state,
                         "dest": dest,
                     }
@@ -73,6 +300,22 @@ class FSMGenerator:
 
         return transitions
 
+    def _generate_connected_transitions(self) -> None:
+        """
+        Generate random transitions along a random cycle through every state, which makes the
+        machine connected by construction. The remaining transitions are added as leftovers.
+        """
+        self.transitions = []
+        cycle = self.rng.sample(range(len(self.states)), len(self.states))
+
+        for source, dest in zip(cycle, cycle[1:] + cycle[:1]):
+            self._set_transition(
+                source,
+                self._event_index[self.rng.choice(self.events)],
+                dest,
+                self._output_index[self.rng.choice(self.outputs)],
+            )
+
     def _is_reachable_from(self, state: str, target: str) -> bool:
         """
         Check if a target state is reachable from a given state.
@@ -84,8 +327,9 @@ class FSMGenerator:
         Returns:
             bool: True if the target state is reachable from the source state, False otherwise.
         """
+        target = self._state_index[target]
         reachable_states = set()
-        states_to_check = [state]
+        states_to_check = [self._state_index[state]]
 
         while states_to_check:
             current_state = states_to_check.pop()
@@ -93,16 +337,29 @@ class FSMGenerator:
             if current_state == target:
                 return True
 
-            for transition in self.transitions:
-                if (
-                    transition["source"] == current_state
-                    and transition["dest"] not in reachable_states
-                ):
-                    reachable_states.add(transition["dest"])
-                    states_to_check.append(transition["dest"])
+            for dest in self.dest_table[current_state].tolist():
+                if dest != -1 and dest not in reachable_states:
+                    reachable_states.add(dest)
+                    states_to_check.append(dest)
 
         return False
 
+    def _get_events(self, state: int) -> list[int]:
+        """
+        Get the indices of the events with a defined transition from a given state.
+
+        Args:
+            state (int): The index of the state to get events for.
+
+        Returns:
+            list: A list of event indices in ascending order.
+        """
+        return [
+            event
+            for event, dest in enumerate(self.dest_table[state].tolist())
+            if dest != -1
+        ]
+
     def _get_triggers(self, state: str) -> list:
         """
         Get triggers for a given state.
@@ -113,96 +370,118 @@ class FSMGenerator:
         Returns:
             list: A list of triggers for the given state.
         """
-        triggers = []
-
-        for transition in self.transitions:
-            if transition["source"] == state:
-                triggers.append(transition["trigger"])
+        source = self._state_index[state]
 
-        return triggers
+        return [
+            self._get_transition(source, event)["trigger"]
+            for event in self._get_events(source)
+        ]
 
     def _add_leftover_transitions(self) -> None:
         """
         Add any transitions that are missing for an event to make the machine complete.
         """
-        for state in self.states:
-            current_triggers = [trigger[0] for trigger in self._get_triggers(state)]
-            available_triggers = [
-                event for event in self.events if event not in current_triggers
-            ]
+        for source in range(len(self.states)):
+            for event in np.flatnonzero(self.dest_table[source] == -1).tolist():
+                dest = self.rng.choice(self.states)
 
-            for trigger in available_triggers:
-                dest = random.choice(self.states)
-
-                self.transitions.append(
-                    {
-                        "trigger": trigger + " / " + random.choice(self.outputs),
-                        "source": state,
-                        "dest": dest,
-                    }
+                self._set_transition(
+                    source,
+                    event,
+                    self._state_index[dest],
+                    self._output_index[self.rng.choice(self.outputs)],
                 )
 
     def _ensure_connected_machine(self) -> bool:
         """
-        Ensure that all states are reachable from any other state.
+        Ensure that all states are reachable from any other state, by linking the strongly
+        connected components of the machine into a cycle.
 
         Returns:
             bool: True if the machine is connected, False otherwise.
         """
-        for state in self.states:
-            for target in self.states:
-                if state == target:
-                    continue
-
-                if not self._is_reachable_from(state, target):
-                    current_triggers = [
-                        trigger[0] for trigger in self._get_triggers(state)
-                    ]
-                    available_triggers = [
-                        event for event in self.events if event not in current_triggers
-                    ]
-
-                    if not available_triggers:
-                        return False
-
-                    self.transitions.append(
-                        {
-                            "trigger": available_triggers[0]
-                            + " / "
-                            + random.choice(self.outputs),
-                            "source": state,
-                            "dest": target,
-                        }
-                    )
+        components = strongly_connected_components(self.dest_table)
+
+        if len(components) <= 1:
+            return True
+
+        for component, next_component in zip(
+            components, components[1:] + components[:1]
+        ):
+            available_triggers = [
+                (state, event)
+                for state in component
+                for event in np.flatnonzero(self.dest_table[state] == -1).tolist()
+            ]
+
+            if not available_triggers:
+                return False
+
+            source, event = available_triggers[0]
+            self._set_transition(
+                source,
+                event,
+                self.rng.choice(next_component),
+                self._output_index[self.rng.choice(self.outputs)],
+            )
 
         return True
 
-    def _find_1_equivalent(self) -> dict[str, set]:
+    def _find_1_equivalent(self) -> dict[tuple, set]:
         """
         Find the states that are equivalent with respect to their input/output.
 
         Returns:
-            dict: A dictionary of equivalence sets.
+            dict: A dictionary of equivalence sets, keyed by the outputs of the states.
         """
         equivalence_sets = dict()
 
-        for state in self.states:
-            triggers = self._get_triggers(state)
+        for state, outputs in zip(self.states, self.output_table.tolist()):
+            equivalence_sets.setdefault(tuple(outputs), set()).add(state)
 
-            io_string = ""
-            for trigger in triggers:
-                io_string += f"{trigger},"
+        return equivalence_sets
 
-            io_list = io_string.split(",")
-            io_list.sort()
-            io_string = "".join(io_list)
+    @staticmethod
+    def _number_blocks(signatures: np.ndarray) -> np.ndarray:
+        """
+        Group rows with equal signatures into blocks, numbered in order of first occurrence.
 
-            if io_string not in equivalence_sets.keys():
-                equivalence_sets[io_string] = set()
+        Args:
+            signatures (np.ndarray): A 2-D array with the signature of each state as a row.
 
-            equivalence_sets[io_string].add(state)
+        Returns:
+            np.ndarray: The block index of each state.
+        """
+        _, first, blocks = np.unique(
+            signatures, axis=0, return_index=True, return_inverse=True
+        )
 
-        return equivalence_sets
+        order = np.empty(len(first), np.int32)
+        order[np.argsort(first)] = np.arange(len(first), dtype=np.int32)
+
+        return order[blocks.reshape(-1)]
+
+    def _refine_partition(self, blocks: np.ndarray) -> np.ndarray:
+        """
+        Refine a partition of the states until states in the same block move to the same blocks
+        for every event (Moore's algorithm over the transition table).
+
+        Args:
+            blocks (np.ndarray): The block index of each state in the initial partition.
+
+        Returns:
+            np.ndarray: The block index of each state in the refined partition.
+        """
+        num_blocks = len(np.unique(blocks))
+
+        while True:
+            dest_blocks = np.where(self.dest_table != -1, blocks[self.dest_table], -1)
+            blocks = self._number_blocks(np.column_stack([blocks, dest_blocks]))
+
+            if blocks.max(initial=-1) + 1 == num_blocks:
+                return blocks
+
+            num_blocks = blocks.max() + 1
 
     def _get_dest_from_trigger(self, source: str, trigger: str) -> str:
         """
@@ -215,10 +494,15 @@ class FSMGenerator:
         Returns:
             str: The destination state of the transition.
         """
+        event, _, output = trigger.partition(" / ")
 
-        for transition in self.transitions:
-            if transition["source"] == source and transition["trigger"] == trigger:
-                return transition["dest"]
+        if source in self._state_index and event in self._event_index:
+            source = self._state_index[source]
+            event = self._event_index[event]
+            dest = self.dest_table[source, event]
+
+            if dest != -1 and self.outputs[self.output_table[source, event]] == output:
+                return self.states[dest]
 
         raise LookupError(
             f"No valid transition found for state '{source}' with trigger '{trigger}'"
@@ -237,16 +521,16 @@ class FSMGenerator:
         """
         transitions = []
 
-        for transition in self.transitions:
-            if source and dest:
-                if transition["source"] == source and transition["dest"] == dest:
-                    transitions.append(transition)
-            elif source:
-                if transition["source"] == source:
-                    transitions.append(transition)
-            elif dest:
-                if transition["dest"] == dest:
-                    transitions.append(transition)
+        if not source and not dest:
+            return transitions
+
+        sources = [self._state_index[source]] if source else range(len(self.states))
+        dest = self._state_index[dest] if dest else None
+
+        for state in sources:
+            for event, state_dest in enumerate(self.dest_table[state].tolist()):
+                if state_dest != -1 and (dest is None or state_dest == dest):
+                    transitions.append(self._get_transition(state, event))
 
         return transitions
 
@@ -257,86 +541,89 @@ class FSMGenerator:
         Returns:
             list: A list of sets of equivalent states.
         """
-        previous_equivalence_dict = self._find_1_equivalent()
-
-        # Check for if every transition is 1-equivalent for every state in the FSM
-        if len(previous_equivalence_dict) != 1:
-            while True:
-                current_equivalence_dict = dict()
-
-                for key, eq_set in previous_equivalence_dict.items():
-                    for state in eq_set:
-                        triggers = self._get_triggers(state)
-                        subset_pointer = key
-
-                        for trigger in triggers:
-                            trigger_input = trigger.split(" / ")[0]
-                            trigger_output = trigger.split(" / ")[1]
-                            subset_pointer += trigger_input
-                            subset_pointer += trigger_output
-
-                            dest = self._get_dest_from_trigger(state, trigger)
+        blocks = self._refine_partition(self._number_blocks(self.output_table))
 
-                            for key, eq_set in previous_equivalence_dict.items():
-                                if dest in eq_set:
-                                    subset_pointer += f"{key},"
-                                    break
+        equivalence_sets = defaultdict(set)
+        for state, block in zip(self.states, blocks.tolist()):
+            equivalence_sets[block].add(state)
 
-                        subset_pointer_list = subset_pointer.split(",")
-                        subset_pointer_list.sort()
-                        subset_pointer = "".join(subset_pointer_list)
+        return [eq_set for eq_set in equivalence_sets.values() if len(eq_set) > 1]
 
-                        if subset_pointer not in current_equivalence_dict.keys():
-                            current_equivalence_dict[subset_pointer] = set()
+    def _separate_equivalent_states(self) -> bool:
+        """
+        Change outputs of equivalent states until every state can be distinguished from every other.
+        Each change gives one state outputs that no other state has, which can only split blocks of
+        equivalent states, so the partition is refined from the previous one rather than from scratch.
 
-                        current_equivalence_dict[subset_pointer].add(state)
+        Returns:
+            bool: True if all states can be distinguished, False if no output change could separate them.
+        """
+        blocks = self._refine_partition(self._number_blocks(self.output_table))
+
+        while blocks.max(initial=-1) + 1 < len(self.states):
+            # Pick a state that is equivalent to a state with a lower index
+            _, first_states = np.unique(blocks, return_index=True)
+            equivalent_states = np.setdiff1d(np.arange(len(self.states)), first_states)
+            state = int(self.rng.choice(equivalent_states))
+
+            outputs = self.output_table[state].tolist()
+            used_outputs = set(
+                map(tuple, np.delete(self.output_table, state, 0).tolist())
+            )
+            changes = [
+                (event, output)
+                for event in range(len(self.events))
+                for output in range(len(self.outputs))
+                if output != outputs[event]
+                and tuple(outputs[:event] + [output] + outputs[event + 1 :])
+                not in used_outputs
+            ]
 
-                if sorted(current_equivalence_dict.values()) == sorted(
-                    previous_equivalence_dict.values()
-                ):
-                    break
+            if not changes:
+                return False
 
-                previous_equivalence_dict = current_equivalence_dict
+            event, output = self.rng.choice(changes)
+            self.output_table[state, event] = output
 
-        equivalent_states = []
-        for eq_set in previous_equivalence_dict.values():
-            if len(eq_set) > 1:
-                equivalent_states.append(eq_set)
+            blocks = blocks.copy()
+            blocks[state] = blocks.max() + 1
+            blocks = self._refine_partition(blocks)
 
-        return equivalent_states
+        return True
 
     def _make_minimal(self) -> None:
         """
         Make the machine minimal by removing redundant states.
+        Each set of equivalent states is merged into the state with the lowest index.
         """
-        equivalence_states = self._find_equivalent_states()
-        equivalence_states = [list(eq_set) for eq_set in equivalence_states]
+        representatives = np.arange(len(self.states), dtype=np.int32)
+        removed_states = set()
 
-        for eq_set in equivalence_states:
-            for state_index in range(1, len(eq_set)):
-                state = eq_set[state_index]
+        for eq_set in self._find_equivalent_states():
+            eq_set = sorted(self._state_index[state] for state in eq_set)
+            representatives[eq_set] = eq_set[0]
+            removed_states.update(self.states[state] for state in eq_set[1:])
 
-                source_transitions = self._get_transitions(source=state)
-                dest_transitions = self._get_transitions(dest=state)
+        self.dest_table = np.where(
+            self.dest_table != -1, representatives[self.dest_table], -1
+        ).astype(np.int32)
+        self.states = [state for state in self.states if state not in removed_states]
 
-                for transition in dest_transitions:
-                    transition["dest"] = eq_set[0]
-
-                for transition in source_transitions:
-                    transition["source"] = eq_set[0]
-
-                self.states.remove(state)
+        self._cleanup_transitions()
 
     def _cleanup_transitions(self) -> None:
         """
-        Remove duplicate transitions from the machine.
+        Remove the transitions of states that are no longer in the machine from the transition table.
         """
-        transitions = []
-        for transition in self.transitions:
-            if transition not in transitions:
-                transitions.append(transition)
+        rows = [self._state_index[state] for state in self.states]
+
+        # Map old state indices to new ones, the extra last entry keeps -1 (undefined) as -1
+        new_index = np.full(len(self.dest_table) + 1, -1, np.int32)
+        new_index[rows] = np.arange(len(rows), dtype=np.int32)
 
-        self.transitions = transitions
+        self.dest_table = new_index[self.dest_table[rows]]
+        self.output_table = self.output_table[rows]
+        self._build_indices()
 
     def save(self, filename: str) -> None:
         """
@@ -365,22 +652,52 @@ class FSMGenerator:
 
         Args:
             state (str): The state to start from.
-            sequence (str): The input sequence to apply.
+            sequence (str | list[str]): The input sequence to apply, one event name per item.
 
         Returns:
             tuple: The final state and the output sequence.
         """
         output_seq = []
+        state = self._state_index[state]
 
         for event in sequence:
-            if event not in self.events:
+            if event not in self._event_index:
                 raise ValueError(f"Invalid event: '{event}' in sequence.")
-            for transition in self.transitions:
-                if transition["source"] == state and transition["trigger"].startswith(
-                    event
-                ):
-                    output_seq.append(transition["trigger"].split(" / ")[1])
-                    state = transition["dest"]
-                    break
-
-        return state, tuple(output_seq)
+
+            event = self._event_index[event]
+            dest = self.dest_table[state, event]
+
+            if dest != -1:
+                output_seq.append(self.outputs[self.output_table[state, event]])
+                state = dest
+
+        return self.states[state], tuple(output_seq)
+
+    def apply_input_sequences(
+        self, sequences: np.ndarray, states: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Apply a batch of input sequences to the machine, one step of every sequence at a time.
+
+        Args:
+            sequences (np.ndarray): A 2-D array of event indices with one input sequence per row.
+                Shorter sequences can be padded with -1.
+            states (np.ndarray): The index of the state to start each sequence from.
+
+        Returns:
+            tuple: The index of the final state of each sequence and the matrix of output indices
+            (-1 where no output was produced).
+        """
+        sequences = np.asarray(sequences, dtype=np.int32).reshape(len(sequences), -1)
+        states = np.broadcast_to(np.asarray(states, dtype=np.int32), len(sequences))
+        outputs = np.full(sequences.shape, -1, np.int32)
+
+        for step in range(sequences.shape[1]):
+            events = sequences[:, step]
+            dests = np.where(events != -1, self.dest_table[states, events], -1)
+            defined = dests != -1
+
+            outputs[defined, step] = self.output_table[states, events][defined]
+            states = np.where(defined, dests, states)
+
+        return states, outputs
@@ -0,0 +1,72 @@
+import numpy as np
+
+
+def strongly_connected_components(dest_table: np.ndarray) -> list[list[int]]:
+    """
+    Find the strongly connected components of a machine with Tarjan's algorithm, in time linear in
+    the size of its transition table.
+
+    Args:
+        dest_table (np.ndarray): The index of the destination state for every state/event pair
+            (-1 if undefined).
+
+    Returns:
+        list: The components as sorted lists of state indices, in reverse topological order
+        (a component is listed before any component that can reach it).
+    """
+    successors = [
+        [dest for dest in dest_row if dest != -1] for dest_row in dest_table.tolist()
+    ]
+    num_states = len(successors)
+
+    index = [-1] * num_states
+    lowlink = [0] * num_states
+    on_stack = [False] * num_states
+    stack = []
+    components = []
+    counter = 0
+
+    for root in range(num_states):
+        if index[root] != -1:
+            continue
+
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+
+        # Iterative depth-first search, storing the next successor to visit for each state
+        work = [(root, 0)]
+        while work:
+            state, i = work[-1]
+
+            if i < len(successors[state]):
+                work[-1] = (state, i + 1)
+                dest = successors[state][i]
+
+                if index[dest] == -1:
+                    index[dest] = lowlink[dest] = counter
+                    counter += 1
+                    stack.append(dest)
+                    on_stack[dest] = True
+                    work.append((dest, 0))
+                elif on_stack[dest]:
+                    lowlink[state] = min(lowlink[state], index[dest])
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[state])
+
+            if lowlink[state] == index[state]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == state:
+                        break
+                components.append(sorted(component))
+
+    return components
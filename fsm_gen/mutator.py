@@ -1,8 +1,9 @@
-import copy
 import random
+from typing import Iterable, Iterator
 
 from fsm_gen.generator import FSMGenerator
-from fsm_gen.machine import Machine
+from fsm_gen.graph import strongly_connected_components
+from fsm_gen.overlay import TableOverlay
 
 
 class Mutator:
@@ -14,32 +15,38 @@ class Mutator:
         "change_trans_dest",
     ]
 
-    def __init__(self, fsm: FSMGenerator) -> None:
+    def __init__(self, fsm: FSMGenerator, rng: random.Random = None) -> None:
         """
         Create a mutator instance for a given FSM.
 
         Args:
-            fsm (FSMGenerator): the (unmutated) FSM to apply mutations to.
+            fsm (FSMGenerator): the (unmutated) FSM to apply mutations to, it is never changed.
+            rng (random.Random): the random number generator to choose mutations with.
         """
-        self.fsm = copy.deepcopy(fsm)
+        self.overlay = TableOverlay(fsm)
+        self.rng = rng if rng is not None else random.Random()
         self.num_mutations = 1
         self.mutations_applied = []
+        self._base_connected = None
+
+    @property
+    def fsm(self) -> FSMGenerator:
+        """
+        The mutated FSM, built from the original FSM and the mutations applied so far.
+
+        Returns:
+            FSMGenerator: The mutated FSM.
+        """
+        return self.overlay.materialise()
 
     def create_mutated_fsm(self) -> FSMGenerator:
         """
-        Apply mutations to a given finite state machine, store the result and render the mutated FSM.
+        Apply mutations to a given finite state machine and store the result.
 
         Returns:
             Machine: The mutated FSM
         """
         self._mutate()
-        self.fsm.machine = Machine(
-            states=self.fsm.states,
-            initial=self.fsm.states[0],
-            graph_engine="pygraphviz",
-            auto_transitions=False,
-            transitions=self.fsm.transitions,
-        )
 
         return self.fsm
 
@@ -48,22 +55,12 @@ class Mutator:
         Apply a variety of mutations to a given FSM (corresponding to the number of states).
         """
         for _ in range(self.num_mutations):
-            original_fsm = copy.deepcopy(self.fsm)
-            mutation = random.choice(self.MUTATION_TYPES)
-
-            match mutation:
-                case "add_state":
-                    self._add_state()
-                case "remove_state":
-                    self._remove_state()
-                case "change_trigger_output":
-                    self._change_trigger_output()
-                case "change_trans_dest":
-                    self._change_trans_dest()
+            snapshot = self.overlay.snapshot()
+            mutation = self.rng.choice(self.MUTATION_TYPES)
 
             # Ensure connectivity after each mutation (and apply change trigger output as a fallback)
-            if not self._check_connectivity():
-                self.fsm = copy.deepcopy(original_fsm)
+            if not self._apply_mutation(mutation):
+                self.overlay.restore(snapshot)
                 self._change_trigger_output()
 
         if self.DEBUG:
@@ -72,230 +69,468 @@ class Mutator:
                 print(f"\t{mutation}")
             self.get_machine_properties()
 
-    def _add_state(self):
+    def generate_mutants(
+        self, n: int, types: list[str] = None, seed: int = None
+    ) -> list[FSMGenerator]:
+        """
+        Generate distinct first-order mutants, each a single mutation of the FSM. Mutations that
+        disconnect the machine are discarded, as are duplicates, found by the edits they make.
+        Each mutant shares the tables the mutation leaves unchanged with the FSM, and records the
+        mutation made in its mutations_applied.
+
+        Args:
+            n (int): the number of mutants to generate.
+            types (list[str]): the mutation types to choose from, all of MUTATION_TYPES by default.
+            seed (int): the seed to choose mutations with, the mutator's own generator is used if not given.
+
+        Returns:
+            list[FSMGenerator]: up to n mutants, fewer if that many distinct ones were not found
+            within 10 attempts per mutant.
+        """
+        types = types if types is not None else self.MUTATION_TYPES
+        rng = random.Random(seed) if seed is not None else self.rng
+        previous_rng, self.rng = self.rng, rng
+        snapshot = self.overlay.snapshot()
+        num_mutations_applied = len(self.mutations_applied)
+        seen = {self.overlay.key()}
+        mutants = []
+
+        try:
+            for _ in range(10 * n):
+                if len(mutants) == n:
+                    break
+
+                if self._apply_mutation(self.rng.choice(types)):
+                    key = self.overlay.key()
+                    if key not in seen:
+                        seen.add(key)
+                        mutant = self.overlay.materialise()
+                        mutant.mutations_applied = self.mutations_applied[
+                            num_mutations_applied:
+                        ]
+                        mutants.append(mutant)
+
+                self.overlay.restore(snapshot)
+                del self.mutations_applied[num_mutations_applied:]
+        finally:
+            self.rng = previous_rng
+
+        return mutants
+
+    def output_faults(self) -> Iterator[tuple[int, int, int, int]]:
+        """
+        Stream every output fault of the FSM, each transition with each of the other output symbols.
+
+        Returns:
+            Iterator[tuple[int, int, int, int]]: |T|·(|O|-1) (source, event, dest, output) edits.
+        """
+        overlay = self.overlay
+
+        for source, event in overlay.transitions():
+            dest = overlay.dest(source, event)
+            output = overlay.output(source, event)
+
+            for new_output in range(len(overlay.outputs)):
+                if new_output != output:
+                    yield source, event, dest, new_output
+
+    def transfer_faults(self) -> Iterator[tuple[int, int, int, int]]:
+        """
+        Stream every transfer fault of the FSM, each transition redirected to each of the other states.
+
+        Returns:
+            Iterator[tuple[int, int, int, int]]: |T|·(n-1) (source, event, dest, output) edits.
+        """
+        overlay = self.overlay
+        states = overlay.states
+
+        for source, event in overlay.transitions():
+            dest = overlay.dest(source, event)
+            output = overlay.output(source, event)
+
+            for new_dest in states:
+                if new_dest != dest:
+                    yield source, event, new_dest, output
+
+    def sample_fault_combinations(
+        self, k: int, n: int, seed: int = None
+    ) -> Iterator[tuple[tuple[int, int, int, int], ...]]:
+        """
+        Lazily sample distinct combinations of k output or transfer faults on different transitions.
+        Faults are drawn by their position among all faults, so the faults are never listed.
+
+        Args:
+            k (int): the number of faults in each combination.
+            n (int): the number of combinations to sample.
+            seed (int): the seed to sample with, the mutator's own generator is used if not given.
+
+        Returns:
+            Iterator[tuple]: up to n combinations of (source, event, dest, output) edits, fewer if
+            that many distinct ones were not found within 10 attempts per combination.
+        """
+        overlay = self.overlay
+        rng = random.Random(seed) if seed is not None else self.rng
+        transitions = overlay.transitions()
+        states = overlay.states
+        position = {state: i for i, state in enumerate(states)}
+        num_other_outputs = len(overlay.outputs) - 1
+        num_output_faults = len(transitions) * num_other_outputs
+        num_faults = num_output_faults + len(transitions) * (len(states) - 1)
+        seen = set()
+
+        for _ in range(10 * n):
+            if len(seen) == n:
+                break
+
+            indices = tuple(sorted(rng.sample(range(num_faults), k)))
+            if indices in seen:
+                continue
+
+            faults = []
+            for index in indices:
+                if index < num_output_faults:
+                    transition, other = divmod(index, num_other_outputs)
+                    source, event = transitions[transition]
+                    output = overlay.output(source, event)
+                    dest = overlay.dest(source, event)
+                    output = other + (other >= output)
+                else:
+                    transition, other = divmod(
+                        index - num_output_faults, len(states) - 1
+                    )
+                    source, event = transitions[transition]
+                    output = overlay.output(source, event)
+                    other += other >= position[overlay.dest(source, event)]
+                    dest = states[other]
+
+                faults.append((source, event, dest, output))
+
+            # Faults on the same transition would overwrite each other
+            if len({fault[:2] for fault in faults}) == k:
+                seen.add(indices)
+                yield tuple(faults)
+
+    def stream_mutants(self, faults: Iterable[tuple]) -> Iterator[FSMGenerator]:
+        """
+        Build a mutant for each fault, or combination of faults, one at a time.
+
+        Args:
+            faults (Iterable[tuple]): (source, event, dest, output) edits, or tuples of them.
+
+        Returns:
+            Iterator[FSMGenerator]: a mutant for each item, the mutator's FSM is left unchanged.
+        """
+        overlay = self.overlay
+        snapshot = overlay.snapshot()
+
+        for edits in faults:
+            if isinstance(edits[0], int):
+                edits = (edits,)
+
+            for source, event, dest, output in edits:
+                overlay.set(source, event, dest, output)
+
+            mutant = overlay.materialise()
+            overlay.restore(snapshot)
+            yield mutant
+
+    def _apply_mutation(self, mutation: str) -> bool:
+        """
+        Apply a single mutation of a given type to the FSM.
+
+        Args:
+            mutation (str): the type of mutation, one of MUTATION_TYPES.
+
+        Returns:
+            bool: Whether the machine is still connected.
+        """
+        match mutation:
+            case "add_state":
+                return self._add_state()
+            case "remove_state":
+                return self._remove_state()
+            case "change_trigger_output":
+                return self._change_trigger_output()
+            case "change_trans_dest":
+                return self._change_trans_dest()
+
+        raise ValueError(f"Invalid mutation type: '{mutation}'")
+
+    def _add_state(self) -> bool:
         """
         Add a new state to a FSM and ensure it is connected to other states in the system.
+
+        Returns:
+            bool: Whether the machine is still connected.
         """
+        overlay = self.overlay
+
         # Get random source state and transition
-        source_state = random.choice(self.fsm.states)
-        source_state_trans = random.choice(
-            [t for t in self.fsm.transitions if t["source"] == source_state]
-        )
+        source = self.rng.choice(overlay.states)
+        source_event = self.rng.choice(overlay.events(source))
 
         # Create new state
-        last_state_num = self.fsm.states[-1][1:]
+        last_state_num = overlay.names[overlay.states[-1]][1:]
         new_state = f"S{int(last_state_num) + 1}"
-        self.fsm.states.append(new_state)
+        new = overlay.add_state(new_state)
 
         # Add new transition from new state to dest of source_state
         # Modify source_state transition to point to new state
-        used_event = random.choice(self.fsm.events)
-        self.fsm.transitions.append(
-            {
-                "source": new_state,
-                "trigger": used_event + " / " + str(random.randint(0, 1)),
-                "dest": source_state_trans["dest"],
-            }
+        used_event = self.rng.randrange(overlay.num_events)
+        old_dest = overlay.dest(source, source_event)
+        overlay.set(
+            new,
+            used_event,
+            old_dest,
+            overlay.output_id(str(self.rng.randint(0, 1))),
         )
-        source_state_trans["dest"] = new_state
+        overlay.set(source, source_event, new, overlay.output(source, source_event))
 
         # Add transitions from new state to other states for remaining events
-        for event in self.fsm.events:
+        for event in range(overlay.num_events):
             if event != used_event:
-                self.fsm.transitions.append(
-                    {
-                        "source": new_state,
-                        "trigger": event + " / " + str(random.randint(0, 1)),
-                        "dest": random.choice(self.fsm.states),
-                    }
+                overlay.set(
+                    new,
+                    event,
+                    self.rng.choice(overlay.states),
+                    overlay.output_id(str(self.rng.randint(0, 1))),
                 )
 
         self.mutations_applied.append(
-            f"Added state {new_state} using {source_state_trans}"
+            f"Added state {new_state} using {overlay.transition(source, source_event)}"
         )
 
-    def _remove_state(self):
+        return self._is_connected_after_redirect(
+            source, old_dest
+        ) and self._is_connected_after_addition(new)
+
+    def _remove_state(self) -> bool:
         """
         Remove a state from a FSM and reroute/delete its associated transitions.
+
+        Returns:
+            bool: Whether the machine is still connected.
         """
+        overlay = self.overlay
+
         # Ensure initial state cannot be removed
-        states_to_check = [
-            state for state in self.fsm.states if state not in self.fsm.states[0]
-        ]
+        states_to_check = overlay.states[1:]
         state_found = False
 
-        # Store original states and transitions in case the machine needs to be reverted
-        original_states = copy.deepcopy(self.fsm.states)
-        original_transitions = copy.deepcopy(self.fsm.transitions)
-        original_fsm = copy.deepcopy(self.fsm)
-
         while len(states_to_check) != 0 and state_found == False:
-            state_to_remove = random.choice(states_to_check)
+            state_to_remove = self.rng.choice(states_to_check)
 
             # Only remove states if they have equal or more incoming transitions as outgoing transitions
             if self._get_num_transitions_exclude_loops(
                 state_to_remove, True
             ) >= self._get_num_transitions_exclude_loops(state_to_remove, False):
-                outgoing_state_trans = [
-                    t for t in self.fsm.transitions if t["source"] == state_to_remove
-                ]
-                incoming_state_trans = [
-                    t for t in self.fsm.transitions if t["dest"] == state_to_remove
-                ]
+                # Mark the overlay in case the machine needs to be reverted
+                snapshot = overlay.snapshot()
 
                 # Remove all outgoing transitions, but store their destination states to ensure they can still be reached
-                dest_states = []
-                for transition in outgoing_state_trans:
-                    self.fsm.transitions = [
-                        t for t in self.fsm.transitions if t != transition
-                    ]
-                    if transition["dest"] != state_to_remove:
-                        dest_states.append(transition["dest"])
+                dest_states = [
+                    dest
+                    for event in overlay.events(state_to_remove)
+                    if (dest := overlay.dest(state_to_remove, event)) != state_to_remove
+                ]
 
-                random.shuffle(dest_states)
-                self.fsm.states.remove(state_to_remove)
+                self.rng.shuffle(dest_states)
+                successors = set(dest_states)
+                predecessors = {
+                    source
+                    for source, _ in overlay.incoming(state_to_remove)
+                    if source != state_to_remove
+                }
+                overlay.remove_state(state_to_remove)
 
                 # Reroute incoming transitions to previously found destination states
-                for transition in incoming_state_trans:
+                for source, event in overlay.incoming(state_to_remove):
                     if len(dest_states) > 0:
                         dest_state = dest_states[0]
-                        transition["dest"] = dest_state
                         dest_states = dest_states[1:]
                     else:
-                        dest_state = random.choice(
-                            [
-                                state
-                                for state in self.fsm.states
-                                if state != transition["source"]
-                            ]
+                        dest_state = self.rng.choice(
+                            [state for state in overlay.states if state != source]
                         )
-                        transition["dest"] = dest_state
+                    overlay.set(
+                        source, event, dest_state, overlay.output(source, event)
+                    )
 
                 # Check that connectivity is maintained when this state is removed
-                if self._check_connectivity():
+                if self._is_connected_after_removal(predecessors, successors):
                     state_found = True
-                    self.mutations_applied.append(f"Removed state {state_to_remove}")
-                else:
-                    self.fsm = original_fsm
-                    self.fsm.states = original_states[:]
-                    self.fsm.transitions = original_transitions[:]
-                    self.fsm.machine = Machine(
-                        states=self.fsm.states,
-                        initial=self.fsm.states[0],
-                        graph_engine="pygraphviz",
-                        auto_transitions=False,
-                        transitions=self.fsm.transitions,
+                    self.mutations_applied.append(
+                        f"Removed state {overlay.names[state_to_remove]}"
                     )
+                else:
+                    overlay.restore(snapshot)
                     states_to_check.remove(state_to_remove)
             else:
                 states_to_check.remove(state_to_remove)
 
-    def _change_trigger_output(self):
+        return state_found or self._check_connectivity()
+
+    def _change_trigger_output(self) -> bool:
         """
         Alter the output of a random transition to a different output symbol.
+
+        Returns:
+            bool: Whether the machine is still connected, always the case as no destination changes.
         """
-        transition = random.choice(self.fsm.transitions)
-        transition_trigger = transition["trigger"].split(" / ")
+        overlay = self.overlay
+        source, event = self.rng.choice(overlay.transitions())
+        output = overlay.output(source, event)
 
-        new_output = random.choice(
-            [out for out in self.fsm.outputs if out != transition_trigger[1]]
+        new_output = self.rng.choice(
+            [out for out in range(len(overlay.outputs)) if out != output]
         )
 
-        transition["trigger"] = f"{transition_trigger[0]} / {new_output}"
+        overlay.set(source, event, overlay.dest(source, event), new_output)
 
         self.mutations_applied.append(
-            f"Changed trigger output of transition {transition}"
+            f"Changed trigger output of transition {overlay.transition(source, event)}"
         )
 
-    def _get_num_transitions_exclude_loops(self, state: str, incoming: bool) -> int:
+        return True
+
+    def _get_num_transitions_exclude_loops(self, state: int, incoming: bool) -> int:
         """
         Retrieve the number of transitions coming into or going out of a state (whilst ignoring those
         that trigger loops within the same state).
 
         Args:
-            state (str): The state to check transitions for.
+            state (int): The index of the state to check transitions for.
             incoming (bool): Whether to check for incoming transitions (True) or outgoing transitions (False).
 
         Returns:
             int: The number of transitions incoming/outgoing for a specific state (excluding self-loops).
         """
-        num_trans = 0
+        if incoming:
+            return sum(source != state for source, _ in self.overlay.incoming(state))
 
-        for transition in self.fsm.transitions:
-            if incoming:
-                if transition["dest"] == state and transition["source"] != state:
-                    num_trans += 1
-            else:
-                if transition["source"] == state and transition["dest"] != state:
-                    num_trans += 1
-
-        return num_trans
+        return sum(
+            self.overlay.dest(state, event) != state
+            for event in self.overlay.events(state)
+        )
 
-    def _change_trans_dest(self):
+    def _change_trans_dest(self) -> bool:
         """
         Alter the destination of a random transition within the FSM (whilst ensuring the FSM stays totally connected).
+
+        Returns:
+            bool: Whether the machine is still connected.
         """
-        transition = random.choice(self.fsm.transitions)
+        overlay = self.overlay
+        transitions = overlay.transitions()
+        source, event = self.rng.choice(transitions)
 
         # Ensures FSM is connected still (and avoid applying mutation to already mutated transitions)
-        while self._get_num_transitions_exclude_loops(transition["dest"], True) < 2:
-            transition = random.choice(self.fsm.transitions)
+        while (
+            self._get_num_transitions_exclude_loops(overlay.dest(source, event), True)
+            < 2
+        ):
+            source, event = self.rng.choice(transitions)
 
         # Make sure random destination state cannot be the same state as original destination
-        random_dest = transition["dest"]
-        while random_dest == transition["dest"]:
-            random_dest = random.choice(self.fsm.states)
-        transition["dest"] = random_dest
+        old_dest = overlay.dest(source, event)
+        random_dest = old_dest
+        while random_dest == old_dest:
+            random_dest = self.rng.choice(overlay.states)
+        overlay.set(source, event, random_dest, overlay.output(source, event))
+
+        self.mutations_applied.append(
+            f"Changed destination of transition {overlay.transition(source, event)}"
+        )
+
+        return self._is_connected_after_redirect(source, old_dest)
+
+    def _check_connectivity(self) -> bool:
+        """
+        For the FSM, determine whether or not it is connected (any given state can be reached from any other state).
 
-        self.mutations_applied.append(f"Changed destination of transition {transition}")
+        Returns:
+            bool: Whether or not the machine is connected.
+        """
+        return len(strongly_connected_components(self.overlay.tables()[0])) <= 1
 
-    def _check_determinism(self) -> bool:
+    def _base_is_connected(self) -> bool:
         """
-        For the FSM, determine whether or not it is deterministic (has only 1 of each input symbol per state).
+        Determine once whether the unmutated FSM is connected. Every mutation that is kept preserves
+        connectivity, so when it is, each edit can be checked locally instead of over the whole machine.
 
         Returns:
-            bool: Whether or not the machine is deterministic.
+            bool: Whether or not the unmutated machine is connected.
         """
-        for state in self.fsm.states:
-            transitions = [t for t in self.fsm.transitions if t["source"] == state]
-            triggers = [t["trigger"].split(" / ")[0] for t in transitions]
-            if len(triggers) != len(set(triggers)):
-                return False
+        if self._base_connected is None:
+            self._base_connected = (
+                len(strongly_connected_components(self.overlay.base.dest_table)) <= 1
+            )
 
-        return True
+        return self._base_connected
 
-    def _check_connectivity(self) -> bool:
+    def _is_connected_after_redirect(self, source: int, old_dest: int) -> bool:
         """
-        For the FSM, determine whether or not it is connected (any given state can be reached from any other state).
+        Determine whether the machine is still connected after a transition from a state has been
+        redirected away from its old destination. Every other path survives, so it is enough for
+        the state to still reach the old destination.
+
+        Args:
+            source (int): The index of the state the transition leaves.
+            old_dest (int): The index of the previous destination of the transition.
 
         Returns:
             bool: Whether or not the machine is connected.
         """
+        if not self._base_is_connected():
+            return self._check_connectivity()
 
-        def dfs(start_state):
-            visited = set()
-            stack = [start_state]
-            while stack:
-                state = stack.pop()
-                if state not in visited:
-                    visited.add(state)
-                    for transition in self.fsm.transitions:
-                        if transition["source"] == state:
-                            stack.append(transition["dest"])
-            return visited
+        return self.overlay.reaches(source, {old_dest})
 
-        all_states = set(self.fsm.states)
-        for state in self.fsm.states:
-            if dfs(state) != all_states:
-                return False
+    def _is_connected_after_addition(self, state: int) -> bool:
+        """
+        Determine whether the machine is still connected after a state has been added, which is the
+        case when the new state and the initial state can reach each other.
 
-        return True
+        Args:
+            state (int): The index of the added state.
+
+        Returns:
+            bool: Whether or not the machine is connected.
+        """
+        if not self._base_is_connected():
+            return self._check_connectivity()
+
+        return self.overlay.reaches(0, {state}) and self.overlay.reaches(state, {0})
+
+    def _is_connected_after_removal(
+        self, predecessors: set[int], successors: set[int]
+    ) -> bool:
+        """
+        Determine whether the machine is still connected after a state has been removed and the
+        transitions into it rerouted. Any path through the removed state entered it from a
+        predecessor and left it to a successor, so it is enough for every predecessor to reach the
+        initial state and for the initial state to reach every successor.
+
+        Args:
+            predecessors (set[int]): The indices of the states that had transitions into the removed state.
+            successors (set[int]): The indices of the states the removed state had transitions to.
+
+        Returns:
+            bool: Whether or not the machine is connected.
+        """
+        if not self._base_is_connected():
+            return self._check_connectivity()
+
+        return self.overlay.reaches(0, successors) and all(
+            self.overlay.reaches(state, {0}) for state in predecessors
+        )
 
     def get_machine_properties(self):
         """
         Display the properties of the FSM in terminal (whether or not it is deterministic and connected).
         """
         connected = self._check_connectivity()
-        deterministic = self._check_determinism()
 
-        print(f"\nConnected: {connected}, Deterministic: {deterministic}")
+        # The transition table holds a single transition per state and event, so the FSM is
+        # always deterministic
+        print(f"\nConnected: {connected}, Deterministic: True")
@@ -0,0 +1,384 @@
+from collections import deque
+
+import numpy as np
+
+from fsm_gen.generator import FSMGenerator
+
+
+class TableOverlay:
+    """
+    Edits to the transition table of a FSM, recorded on top of the FSM without changing it.
+    Every edit is journaled, so the overlay can be rolled back to any earlier snapshot.
+    """
+
+    def __init__(self, fsm: FSMGenerator) -> None:
+        """
+        Create an empty overlay over a FSM. The FSM must not be changed while the overlay is in use.
+
+        Args:
+            fsm (FSMGenerator): the FSM to record edits on top of.
+        """
+        self.base = fsm
+        self.num_base_states = len(fsm.states)
+        self.num_events = len(fsm.events)
+        self.names = list(fsm.states)
+        self.outputs = list(fsm.outputs)
+        self.cells = {}
+        self.removed = set()
+        self._journal = []
+        self._version = 0
+        self._materialised = None
+
+    @property
+    def states(self) -> list[int]:
+        """
+        The indices of the states that have not been removed, in order.
+
+        Returns:
+            list[int]: The live state indices.
+        """
+        return [state for state in range(len(self.names)) if state not in self.removed]
+
+    def _base_cell(self, state: int, event: int) -> tuple[int, int]:
+        """
+        Get the destination and output of a transition in the underlying FSM.
+
+        Args:
+            state (int): The index of the source state.
+            event (int): The index of the event.
+
+        Returns:
+            tuple: The destination and output index, (-1, -1) for states added by the overlay.
+        """
+        if state >= self.num_base_states:
+            return -1, -1
+
+        return (
+            self.base.dest_table.item(state, event),
+            self.base.output_table.item(state, event),
+        )
+
+    def dest(self, state: int, event: int) -> int:
+        """
+        Get the destination of a transition.
+
+        Args:
+            state (int): The index of the source state.
+            event (int): The index of the event.
+
+        Returns:
+            int: The index of the destination state, -1 if the transition is undefined.
+        """
+        return self.cells.get((state, event), self._base_cell(state, event))[0]
+
+    def output(self, state: int, event: int) -> int:
+        """
+        Get the output of a transition.
+
+        Args:
+            state (int): The index of the source state.
+            event (int): The index of the event.
+
+        Returns:
+            int: The index of the output, -1 if the transition is undefined.
+        """
+        return self.cells.get((state, event), self._base_cell(state, event))[1]
+
+    def events(self, state: int) -> list[int]:
+        """
+        Get the events with a defined transition from a state.
+
+        Args:
+            state (int): The index of the state.
+
+        Returns:
+            list[int]: The event indices in ascending order.
+        """
+        return [
+            event for event in range(self.num_events) if self.dest(state, event) != -1
+        ]
+
+    def transitions(self) -> list[tuple[int, int]]:
+        """
+        Get every defined transition of the live states.
+
+        Returns:
+            list[tuple[int, int]]: The (state, event) pairs in row-major order.
+        """
+        transitions = [
+            (state, event)
+            for state, event in np.argwhere(self.base.dest_table != -1).tolist()
+            if (state, event) not in self.cells and state not in self.removed
+        ]
+        transitions += [
+            cell
+            for cell, (dest, _) in self.cells.items()
+            if dest != -1 and cell[0] not in self.removed
+        ]
+        return sorted(transitions)
+
+    def incoming(self, state: int) -> list[tuple[int, int]]:
+        """
+        Get the transitions of the live states that lead to a state.
+
+        Args:
+            state (int): The index of the destination state.
+
+        Returns:
+            list[tuple[int, int]]: The (state, event) pairs in row-major order.
+        """
+        transitions = [
+            (source, event)
+            for source, event in np.argwhere(self.base.dest_table == state).tolist()
+            if (source, event) not in self.cells and source not in self.removed
+        ]
+        transitions += [
+            cell
+            for cell, (dest, _) in self.cells.items()
+            if dest == state and cell[0] not in self.removed
+        ]
+        return sorted(transitions)
+
+    def reaches(self, source: int, targets: set[int]) -> bool:
+        """
+        Check whether every target state can be reached from a state, searching breadth-first and
+        stopping as soon as the last target is found.
+
+        Args:
+            source (int): The index of the state to search from.
+            targets (set[int]): The indices of the states to reach.
+
+        Returns:
+            bool: Whether every target is reachable.
+        """
+        remaining = set(targets) - {source}
+        visited = {source}
+        queue = deque([source])
+
+        while queue and remaining:
+            state = queue.popleft()
+
+            for event in range(self.num_events):
+                dest = self.dest(state, event)
+                if dest != -1 and dest not in visited and dest not in self.removed:
+                    visited.add(dest)
+                    remaining.discard(dest)
+                    queue.append(dest)
+
+        return not remaining
+
+    def transition(self, state: int, event: int) -> dict:
+        """
+        Get a transition as a dictionary, in the same form as the transitions of a FSM.
+
+        Args:
+            state (int): The index of the source state.
+            event (int): The index of the event.
+
+        Returns:
+            dict: The transition for the given source state and event.
+        """
+        return {
+            "trigger": f"{self.base.events[event]} / {self.outputs[self.output(state, event)]}",
+            "source": self.names[state],
+            "dest": self.names[self.dest(state, event)],
+        }
+
+    def set(self, state: int, event: int, dest: int, output: int) -> None:
+        """
+        Set the destination and output of a transition.
+
+        Args:
+            state (int): The index of the source state.
+            event (int): The index of the event.
+            dest (int): The index of the destination state.
+            output (int): The index of the output.
+        """
+        cell = (state, event)
+        self._record("cell", cell, self.cells.get(cell))
+
+        # Only keep cells that differ from the underlying FSM
+        if (dest, output) == self._base_cell(state, event):
+            self.cells.pop(cell, None)
+        else:
+            self.cells[cell] = (dest, output)
+
+    def add_state(self, name: str) -> int:
+        """
+        Add a state without any transitions.
+
+        Args:
+            name (str): The name of the new state.
+
+        Returns:
+            int: The index of the new state.
+        """
+        self._record("state")
+        self.names.append(name)
+        return len(self.names) - 1
+
+    def remove_state(self, state: int) -> None:
+        """
+        Remove a state and its outgoing transitions. Transitions into it are left for the caller
+        to reroute, any that are not become undefined.
+
+        Args:
+            state (int): The index of the state to remove.
+        """
+        self._record("remove", state)
+        self.removed.add(state)
+
+    def output_id(self, output: str) -> int:
+        """
+        Get the index of an output symbol, adding it to the outputs if it is not already known.
+
+        Args:
+            output (str): The output symbol.
+
+        Returns:
+            int: The index of the output symbol.
+        """
+        if output not in self.outputs:
+            self._record("output")
+            self.outputs.append(output)
+
+        return self.outputs.index(output)
+
+    def key(self) -> tuple:
+        """
+        Summarise the edits in a hashable form, equal for overlays with the same edits.
+
+        Returns:
+            tuple: The changed cells, added states, removed states and added outputs.
+        """
+        return (
+            tuple(sorted(self.cells.items())),
+            tuple(self.names[self.num_base_states :]),
+            tuple(sorted(self.removed)),
+            tuple(self.outputs[len(self.base.outputs) :]),
+        )
+
+    def _record(self, kind: str, *args) -> None:
+        """
+        Journal an edit so it can be undone.
+
+        Args:
+            kind (str): The kind of edit.
+            args: What is needed to undo the edit.
+        """
+        self._journal.append((kind, *args))
+        self._version += 1
+
+    def snapshot(self) -> int:
+        """
+        Mark the current state of the overlay.
+
+        Returns:
+            int: A token to restore the overlay to with restore().
+        """
+        return len(self._journal)
+
+    def restore(self, snapshot: int) -> None:
+        """
+        Undo every edit made since a snapshot was taken.
+
+        Args:
+            snapshot (int): The token returned by snapshot().
+        """
+        while len(self._journal) > snapshot:
+            kind, *args = self._journal.pop()
+
+            match kind:
+                case "cell":
+                    cell, previous = args
+                    if previous is None:
+                        self.cells.pop(cell, None)
+                    else:
+                        self.cells[cell] = previous
+                case "state":
+                    self.names.pop()
+                case "remove":
+                    self.removed.discard(args[0])
+                case "output":
+                    self.outputs.pop()
+
+        self._version += 1
+
+    def tables(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Build the transition table of the live states with the edits applied.
+
+        Returns:
+            tuple: The destination and output tables, with states renumbered in order. A table the
+            edits leave unchanged is a read-only view of the underlying FSM's table rather than a
+            copy.
+        """
+        # Without added or removed states the rows keep their indices, so only edited tables
+        # need a copy
+        if not self.removed and len(self.names) == self.num_base_states:
+            return (
+                _apply_cells(self.base.dest_table, self.cells, 0),
+                _apply_cells(self.base.output_table, self.cells, 1),
+            )
+
+        shape = (len(self.names), self.num_events)
+        dest_table = np.full(shape, -1, np.int32)
+        output_table = np.full(shape, -1, np.int32)
+        dest_table[: self.num_base_states] = self.base.dest_table
+        output_table[: self.num_base_states] = self.base.output_table
+
+        for (state, event), (dest, output) in self.cells.items():
+            dest_table[state, event] = dest
+            output_table[state, event] = output
+
+        rows = self.states
+
+        # Map old state indices to new ones, the extra last entry keeps -1 (undefined) as -1
+        new_index = np.full(len(self.names) + 1, -1, np.int32)
+        new_index[rows] = np.arange(len(rows), dtype=np.int32)
+
+        return new_index[dest_table[rows]], output_table[rows]
+
+    def materialise(self) -> FSMGenerator:
+        """
+        Create a FSM with the edits applied. The result is cached until the overlay changes.
+
+        Returns:
+            FSMGenerator: A new FSM of the same type as the underlying one.
+        """
+        if self._materialised is None or self._materialised[0] != self._version:
+            dest_table, output_table = self.tables()
+            fsm = type(self.base).from_table(
+                [self.names[state] for state in self.states],
+                self.base.events,
+                self.outputs,
+                dest_table,
+                output_table,
+            )
+            self._materialised = (self._version, fsm)
+
+        return self._materialised[1]
+
+
+def _apply_cells(table: np.ndarray, cells: dict, column: int) -> np.ndarray:
+    """
+    Apply the edited cells to one table of a FSM, sharing the table if none of them change it.
+
+    Args:
+        table (np.ndarray): The destination or output table of the underlying FSM.
+        cells (dict): The edited (dest, output) of each (state, event).
+        column (int): The position of the table's values in the edits, 0 for dest, 1 for output.
+
+    Returns:
+        np.ndarray: A read-only view of the table if it is unchanged, an edited copy otherwise.
+    """
+    if all(values[column] == table.item(cell) for cell, values in cells.items()):
+        shared = table.view()
+        shared.flags.writeable = False
+        return shared
+
+    table = table.copy()
+    for cell, values in cells.items():
+        table[cell] = values[column]
+
+    return table
@@ -0,0 +1,42 @@
+import random
+
+import numpy as np
+
+
+def spawn_seeds(seed_sequence: np.random.SeedSequence, num_seeds: int) -> list[int]:
+    """
+    Spawn independent integer seeds from a seed sequence, e.g. one for each task of an experiment.
+
+    Args:
+        seed_sequence (np.random.SeedSequence): the seed sequence to spawn from.
+        num_seeds (int): the number of seeds to spawn.
+
+    Returns:
+        list[int]: the spawned seeds.
+    """
+    return [
+        int(child.generate_state(1, np.uint64)[0])
+        for child in seed_sequence.spawn(num_seeds)
+    ]
+
+
+def task_rngs(seed: int) -> tuple[random.Random, random.Random, random.Random]:
+    """
+    Create independent random number generators for the FSM generator, mutator and walk of a task,
+    so the task can be replayed in isolation from its seed.
+
+    Args:
+        seed (int): the seed of the task.
+
+    Returns:
+        tuple: the generator, mutator and walk random number generators.
+    """
+    generator_seed, mutator_seed, walk_seed = spawn_seeds(
+        np.random.SeedSequence(seed), 3
+    )
+
+    return (
+        random.Random(generator_seed),
+        random.Random(mutator_seed),
+        random.Random(walk_seed),
+    )
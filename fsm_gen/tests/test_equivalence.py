@@ -0,0 +1,71 @@
+import itertools
+import random
+
+import numpy as np
+
+from fsm_gen.case_studies import LocalisationSystem
+from fsm_gen.equivalence import are_equivalent, find_distinguishing_sequence
+from fsm_gen.generator import FSMGenerator
+from fsm_gen.mutator import Mutator
+
+
+def brute_force_distinguishing_sequence(
+    fsm1: FSMGenerator, fsm2: FSMGenerator, max_len: int
+) -> list[int] | None:
+    """Find the lexicographically smallest shortest distinguishing sequence by enumeration"""
+    for length in range(1, max_len + 1):
+        for seq in itertools.product(range(len(fsm1.events)), repeat=length):
+            _, outputs1 = fsm1.apply_input_sequences([seq], 0)
+            _, outputs2 = fsm2.apply_input_sequences([seq], 0)
+            if (outputs1 != outputs2).any():
+                return list(seq)
+
+    return None
+
+
+def test_machine_is_equivalent_to_itself():
+    """Test that a machine has no distinguishing sequence with itself."""
+    fsm = LocalisationSystem()
+    assert find_distinguishing_sequence(fsm, fsm) is None
+    assert are_equivalent(fsm, fsm)
+
+
+def test_redundant_state_is_equivalent():
+    """Test that a machine with a duplicated state is equivalent to the one without it."""
+    fsm1 = FSMGenerator.from_table(
+        ["S0"], ["a", "b"], ["0", "1"], np.array([[0, 0]]), np.array([[0, 1]])
+    )
+    fsm2 = FSMGenerator.from_table(
+        ["S0", "S1"],
+        ["a", "b"],
+        ["0", "1"],
+        np.array([[1, 0], [0, 1]]),
+        np.array([[0, 1], [0, 1]]),
+    )
+    assert are_equivalent(fsm1, fsm2)
+
+    # Changing one output of the copy makes the machines differ, after reaching it with a
+    fsm2.output_table[1, 1] = 0
+    assert find_distinguishing_sequence(fsm1, fsm2) == [0, 1]
+
+
+def test_undefined_transitions_distinguish_machines():
+    """Test that a transition defined in only one machine distinguishes them."""
+    fsm = LocalisationSystem()
+    mutator = Mutator(fsm)
+    source, event = mutator.overlay.transitions()[0]
+    mutator.overlay.set(source, event, -1, -1)
+    assert find_distinguishing_sequence(fsm, mutator.fsm) is not None
+
+
+def test_matches_brute_force():
+    """Test that the shortest distinguishing sequence matches enumerating every sequence."""
+    rng = random.Random(0)
+
+    for _ in range(10):
+        fsm = FSMGenerator(4, 2, 2, rng=rng)
+        for mutant in Mutator(fsm, rng=rng).generate_mutants(10):
+            sequence = find_distinguishing_sequence(fsm, mutant)
+            expected = brute_force_distinguishing_sequence(fsm, mutant, 6)
+            if sequence is None or len(sequence) <= 6:
+                assert sequence == expected
@@ -1,7 +1,9 @@
 import collections
 from pathlib import Path
 import pickle
+import random
 
+import numpy as np
 import pytest
 
 from fsm_gen.generator import FSMGenerator
@@ -32,6 +34,7 @@ def is_connected(fsm):
 
     return True
 
+
 def is_deterministic(fsm):
     events = collections.Counter(fsm.events)
 
@@ -44,6 +47,7 @@ def is_deterministic(fsm):
 
     return True
 
+
 def test_fsm_creation(fsm: FSMGenerator):
     """Test that the generator creates a FSM with correct numbers of states, events, and transitions."""
     assert len(fsm.states) == 6
@@ -285,3 +289,134 @@ def test_draw_invalid_path(fsm: FSMGenerator):
     """Test that drawing to an invalid path raises an OSError."""
     with pytest.raises(OSError):
         fsm.draw("/invalid/path/image.png")
+
+
+def test_transition_table(fsm: FSMGenerator):
+    """Test that the transition table is complete and matches the transitions."""
+    assert fsm.dest_table.shape == (len(fsm.states), len(fsm.events))
+    assert fsm.output_table.shape == (len(fsm.states), len(fsm.events))
+    assert (fsm.dest_table != -1).all()
+
+    for transition in fsm.transitions:
+        event, output = transition["trigger"].split(" / ")
+        source = fsm.states.index(transition["source"])
+        event = fsm.events.index(event)
+        assert fsm.states[fsm.dest_table[source, event]] == transition["dest"]
+        assert fsm.outputs[fsm.output_table[source, event]] == output
+
+
+def test_set_transitions(fsm: FSMGenerator):
+    """Test that assigning transitions rebuilds the transition table."""
+    transitions = fsm.transitions
+    fsm.transitions = transitions[1:]
+    assert fsm.transitions == transitions[1:]
+    assert (fsm.dest_table == -1).sum() == 1
+
+    with pytest.raises(ValueError):
+        fsm.transitions = [{"trigger": "A / x", "source": "S0", "dest": "INVALID"}]
+
+
+def test_apply_input_sequences(fsm: FSMGenerator):
+    """Test that applying a batch of input sequences matches applying them one by one."""
+    sequences = np.array([[0, 1, 2, 3], [3, 3, 0, 1], [2, 0, -1, -1]])
+
+    for state in range(len(fsm.states)):
+        final_states, outputs = fsm.apply_input_sequences(sequences, state)
+
+        for sequence, final_state, output_seq in zip(sequences, final_states, outputs):
+            events = [fsm.events[event] for event in sequence if event != -1]
+            expected = fsm.apply_input_sequence(fsm.states[state], events)
+
+            assert fsm.states[final_state] == expected[0]
+            assert tuple(fsm.outputs[o] for o in output_seq if o != -1) == expected[1]
+
+
+def test_make_minimal_merges_into_lowest_state(fsm: FSMGenerator):
+    """Test that equivalent states are merged into the state with the lowest index."""
+    fsm.states = ["S0", "S1", "S2"]
+    fsm.events = ["a", "b"]
+    fsm.transitions = [
+        {"trigger": "a / x", "source": "S0", "dest": "S2"},
+        {"trigger": "b / y", "source": "S0", "dest": "S0"},
+        {"trigger": "a / x", "source": "S1", "dest": "S2"},
+        {"trigger": "b / x", "source": "S1", "dest": "S0"},
+        {"trigger": "a / x", "source": "S2", "dest": "S1"},
+        {"trigger": "b / x", "source": "S2", "dest": "S0"},
+    ]
+
+    assert fsm._find_equivalent_states() == [{"S1", "S2"}]
+
+    fsm._make_minimal()
+    assert fsm.states == ["S0", "S1"]
+    assert fsm.transitions == [
+        {"trigger": "a / x", "source": "S0", "dest": "S1"},
+        {"trigger": "b / y", "source": "S0", "dest": "S0"},
+        {"trigger": "a / x", "source": "S1", "dest": "S1"},
+        {"trigger": "b / x", "source": "S1", "dest": "S0"},
+    ]
+
+
+def test_constructive_fsm():
+    """Test that a constructively generated FSM is connected without any retries."""
+    for num_inputs in range(1, 4):
+        fsm = FSMGenerator(
+            num_states=8, num_inputs=num_inputs, num_outputs=2, constructive=True
+        )
+        assert fsm.retries == 0
+        assert is_connected(fsm)
+        assert is_deterministic(fsm)
+
+
+def test_exact_size_fsm():
+    """Test that an exact size FSM keeps all of its states when made minimal."""
+    for _ in range(10):
+        fsm = FSMGenerator(num_states=6, num_inputs=2, num_outputs=2, exact_size=True)
+        assert len(fsm.states) == 6
+        assert fsm._find_equivalent_states() == []
+        assert is_connected(fsm)
+
+
+def test_exact_size_single_output():
+    """Raise an error if an exact size FSM cannot have distinguishable states."""
+    with pytest.raises(ValueError):
+        FSMGenerator(num_states=4, num_inputs=3, num_outputs=1, exact_size=True)
+
+
+def test_build_machine_reflects_transition_table():
+    """Test that the machine built for drawing follows later edits of the table"""
+    fsm = FSMGenerator(3, 2, 2, exact_size=True, rng=random.Random(0))
+    fsm._set_transition(0, 0, 2, 0)
+    machine = fsm._build_machine()
+    trigger = fsm._get_transition(0, 0)["trigger"]
+    assert machine.get_transitions(trigger, "S0")[0].dest == "S2"
+
+
+def test_machine_built_lazily():
+    """Test that the graph machine is only built on first access and left out of pickles"""
+    fsm = FSMGenerator(3, 2, 2, exact_size=True, rng=random.Random(0))
+    assert fsm._machine is None
+
+    machine = fsm.machine
+    assert machine.initial == fsm.states[0]
+    assert fsm.machine is machine
+    assert pickle.loads(pickle.dumps(fsm))._machine is None
+
+    # Replacing the transitions rebuilds the machine on next access
+    fsm.transitions = fsm.transitions
+    assert fsm.machine is not machine
+
+
+def test_transitions_reject_non_deterministic():
+    """Raise an error if two transitions share a source state and event."""
+    fsm = FSMGenerator(3, 2, 2, exact_size=True, rng=random.Random(0))
+    transition = fsm.transitions[0]
+    event = transition["trigger"].split(" / ")[0]
+    dest = next(state for state in fsm.states if state != transition["dest"])
+    with pytest.raises(ValueError):
+        fsm.transitions = fsm.transitions + [
+            {
+                "trigger": f"{event} / {fsm.outputs[0]}",
+                "source": transition["source"],
+                "dest": dest,
+            }
+        ]
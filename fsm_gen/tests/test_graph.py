@@ -0,0 +1,34 @@
+import numpy as np
+
+from fsm_gen.graph import strongly_connected_components
+
+
+def test_single_component():
+    """Test that a cycle through every state is a single component."""
+    dest_table = np.array([[1, 0], [2, 1], [0, -1]])
+    assert strongly_connected_components(dest_table) == [[0, 1, 2]]
+
+
+def test_multiple_components():
+    """Test that components are found in reverse topological order."""
+    # 0 <-> 1 -> 2 <-> 3, 4 only reaches itself
+    dest_table = np.array([[1, -1], [0, 2], [3, 2], [2, -1], [4, 4]])
+    assert strongly_connected_components(dest_table) == [[2, 3], [0, 1], [4]]
+
+
+def test_no_transitions():
+    """Test that every state is its own component if there are no transitions."""
+    dest_table = np.full((3, 2), -1)
+    assert strongly_connected_components(dest_table) == [[0], [1], [2]]
+
+
+def test_empty_table():
+    """Test that a machine without states has no components."""
+    assert strongly_connected_components(np.full((0, 2), -1)) == []
+
+
+def test_long_chain():
+    """Test that a long cycle does not hit the recursion limit."""
+    num_states = 5000
+    dest_table = ((np.arange(num_states) + 1) % num_states).reshape(-1, 1)
+    assert strongly_connected_components(dest_table) == [list(range(num_states))]
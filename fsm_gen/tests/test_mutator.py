@@ -1,6 +1,10 @@
+import random
+
+import numpy as np
 import pytest
 
 from fsm_gen.case_studies import LocalisationSystem
+from fsm_gen.generator import FSMGenerator
 from fsm_gen.mutator import Mutator
 
 
@@ -99,18 +103,8 @@ def test_get_num_transitions_exclude_loops(mutator: Mutator):
     Test that the get_num_transitions function excludes loops from the count.
     """
     # S0 has 2 self-loops, 2 outgoing and 3 incoming transitions
-    assert mutator._get_num_transitions_exclude_loops("S0", incoming=True) == 3
-    assert mutator._get_num_transitions_exclude_loops("S0", incoming=False) == 2
-
-
-def test_check_determinsism(mutator: Mutator):
-    """
-    Test that the check_determinsism function correctly identifies a non-deterministic FSM.
-    """
-    assert mutator._check_determinism() is True
-    # Add a non-deterministic transition
-    mutator.fsm.transitions.append({"trigger": "N / a", "source": "S0", "dest": "S1"})
-    assert mutator._check_determinism() is False
+    assert mutator._get_num_transitions_exclude_loops(0, incoming=True) == 3
+    assert mutator._get_num_transitions_exclude_loops(0, incoming=False) == 2
 
 
 def test_check_connectivity(mutator: Mutator, fsm: LocalisationSystem):
@@ -119,15 +113,33 @@ def test_check_connectivity(mutator: Mutator, fsm: LocalisationSystem):
     """
     assert mutator._check_connectivity() is True
     # Add a disconnected state
-    mutator.fsm.states.append("S3")
+    snapshot = mutator.overlay.snapshot()
+    mutator.overlay.add_state("S3")
     assert mutator._check_connectivity() is False
     # Remove outbound transitions from S2
-    mutator.fsm.transitions = [
-        t for t in mutator.fsm.transitions if t["source"] != "S2"
-    ]
+    mutator.overlay.restore(snapshot)
+    for event in mutator.overlay.events(2):
+        mutator.overlay.set(2, event, -1, -1)
     assert mutator._check_connectivity() is False
 
 
+def test_mutations_leave_original_unchanged(fsm: LocalisationSystem):
+    """
+    Test that mutating never changes the FSM the mutator was created with.
+    """
+    mutator = Mutator(fsm, rng=random.Random(0))
+    for _ in range(20):
+        mutator._add_state()
+        mutator._change_trigger_output()
+        mutator._change_trans_dest()
+        mutator._remove_state()
+
+    original = LocalisationSystem()
+    assert fsm.transitions == original.transitions
+    assert fsm.states == original.states
+    assert fsm.outputs == original.outputs
+
+
 def test_create_mutated_fsm(mutator: Mutator, fsm: LocalisationSystem):
     """
     Test that the create_mutated_fsm function creates a mutated FSM that is different from the original.
@@ -146,3 +158,149 @@ def test_create_mutated_fsm(mutator: Mutator, fsm: LocalisationSystem):
         elif mutation_applied == "change_trans_dest":
             assert len(mutated_fsm.transitions) == len(fsm.transitions)
             assert mutated_fsm.transitions != fsm.transitions
+
+
+def test_local_connectivity_matches_full_check():
+    """
+    Test that the local connectivity checks after an edit agree with checking the whole machine.
+    """
+    rng = random.Random(0)
+    mutator = Mutator(FSMGenerator(8, 2, 2, exact_size=True, rng=rng), rng=rng)
+    overlay = mutator.overlay
+
+    for _ in range(200):
+        snapshot = overlay.snapshot()
+        source, event = rng.choice(overlay.transitions())
+        old_dest = overlay.dest(source, event)
+        overlay.set(
+            source, event, rng.choice(overlay.states), overlay.output(source, event)
+        )
+        assert (
+            mutator._is_connected_after_redirect(source, old_dest)
+            == mutator._check_connectivity()
+        )
+        overlay.restore(snapshot)
+
+    for _ in range(20):
+        for state in overlay.states[1:]:
+            snapshot = overlay.snapshot()
+            predecessors = {s for s, _ in overlay.incoming(state) if s != state}
+            successors = {overlay.dest(state, e) for e in overlay.events(state)}
+            overlay.remove_state(state)
+            for source, event in overlay.incoming(state):
+                dest = rng.choice([s for s in overlay.states if s != source])
+                overlay.set(source, event, dest, overlay.output(source, event))
+            assert (
+                mutator._is_connected_after_removal(predecessors, successors - {state})
+                == mutator._check_connectivity()
+            )
+            overlay.restore(snapshot)
+
+
+def test_generate_mutants(mutator: Mutator, fsm: LocalisationSystem):
+    """
+    Test that generated mutants are distinct from each other and from the original FSM.
+    """
+    mutants = mutator.generate_mutants(10, seed=0)
+    assert 0 < len(mutants) <= 10
+
+    machines = {
+        (tuple(mutant.states), tuple(map(str, mutant.transitions)))
+        for mutant in mutants
+    }
+    assert len(machines) == len(mutants)
+    assert (tuple(fsm.states), tuple(map(str, fsm.transitions))) not in machines
+
+    # Each mutant records its own mutation
+    for mutant in mutants:
+        assert len(mutant.mutations_applied) == 1
+
+    # Generating mutants leaves the mutator's own FSM unchanged
+    assert mutator.fsm.transitions == fsm.transitions
+    assert mutator.mutations_applied == []
+
+
+def test_generate_mutants_types_and_seed(mutator: Mutator, fsm: LocalisationSystem):
+    """
+    Test that mutants are restricted to the given mutation types and reproducible with a seed.
+    """
+    mutants = mutator.generate_mutants(5, types=["change_trigger_output"], seed=1)
+    assert len(mutants) == 5
+    for mutant in mutants:
+        assert mutant.states == fsm.states
+        assert (mutant.dest_table == fsm.dest_table).all()
+
+        # Output faults leave the destinations unchanged, so the table is shared, read-only
+        assert np.shares_memory(mutant.dest_table, mutator.overlay.base.dest_table)
+        assert not mutant.dest_table.flags.writeable
+        assert not np.shares_memory(
+            mutant.output_table, mutator.overlay.base.output_table
+        )
+
+    repeated = mutator.generate_mutants(5, types=["change_trigger_output"], seed=1)
+    assert [m.transitions for m in repeated] == [m.transitions for m in mutants]
+
+
+def test_exhaustive_faults(mutator: Mutator, fsm: LocalisationSystem):
+    """
+    Test that every output and transfer fault is streamed exactly once.
+    """
+    num_transitions = len(fsm.transitions)
+    output_faults = list(mutator.output_faults())
+    transfer_faults = list(mutator.transfer_faults())
+
+    assert len(output_faults) == num_transitions * (len(fsm.outputs) - 1)
+    assert len(transfer_faults) == num_transitions * (len(fsm.states) - 1)
+    assert len(set(output_faults)) == len(output_faults)
+    assert len(set(transfer_faults)) == len(transfer_faults)
+
+    for source, event, dest, output in output_faults:
+        assert dest == fsm.dest_table[source, event]
+        assert output != fsm.output_table[source, event]
+    for source, event, dest, output in transfer_faults:
+        assert dest != fsm.dest_table[source, event]
+        assert output == fsm.output_table[source, event]
+
+
+def test_stream_mutants(mutator: Mutator, fsm: LocalisationSystem):
+    """
+    Test that each streamed mutant differs from the original FSM in exactly the faulty transitions.
+    """
+    num_mutants = 0
+    for fault, mutant in zip(
+        mutator.transfer_faults(), mutator.stream_mutants(mutator.transfer_faults())
+    ):
+        source, event, dest, output = fault
+        changed = (mutant.dest_table != fsm.dest_table) | (
+            mutant.output_table != fsm.output_table
+        )
+        assert changed.sum() == 1
+        assert mutant.dest_table[source, event] == dest
+        assert mutant.output_table[source, event] == output
+        num_mutants += 1
+
+    assert num_mutants == len(fsm.transitions) * (len(fsm.states) - 1)
+    assert mutator.fsm.transitions == fsm.transitions
+
+
+def test_sample_fault_combinations(mutator: Mutator, fsm: LocalisationSystem):
+    """
+    Test that sampled fault combinations are distinct, reproducible and on different transitions.
+    """
+    faults = set(mutator.output_faults()) | set(mutator.transfer_faults())
+    combinations = list(mutator.sample_fault_combinations(3, 20, seed=0))
+
+    assert len(combinations) == 20
+    assert len(set(combinations)) == 20
+    for combination in combinations:
+        assert len(combination) == 3
+        assert set(combination) <= faults
+        assert len({fault[:2] for fault in combination}) == 3
+
+    assert list(mutator.sample_fault_combinations(3, 20, seed=0)) == combinations
+
+    for combination, mutant in zip(combinations, mutator.stream_mutants(combinations)):
+        changed = (mutant.dest_table != fsm.dest_table) | (
+            mutant.output_table != fsm.output_table
+        )
+        assert changed.sum() == 3
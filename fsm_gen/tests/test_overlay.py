@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from fsm_gen.case_studies import LocalisationSystem
+from fsm_gen.overlay import TableOverlay
+
+
+@pytest.fixture
+def fsm():
+    """
+    Create a fresh FSM.
+    """
+    return LocalisationSystem()
+
+
+@pytest.fixture
+def overlay(fsm: LocalisationSystem):
+    """
+    Create an empty overlay over a fresh FSM.
+    """
+    return TableOverlay(fsm)
+
+
+def test_empty_overlay_materialises_original(
+    overlay: TableOverlay, fsm: LocalisationSystem
+):
+    """
+    Test that an overlay without edits materialises to the same machine.
+    """
+    mutated = overlay.materialise()
+    assert mutated is not fsm
+    assert isinstance(mutated, LocalisationSystem)
+    assert mutated.states == fsm.states
+    assert mutated.transitions == fsm.transitions
+
+
+def test_set_only_changes_overlay(overlay: TableOverlay, fsm: LocalisationSystem):
+    """
+    Test that setting a transition is seen through the overlay but not in the original FSM.
+    """
+    source, event = overlay.transitions()[0]
+    original_dest = overlay.dest(source, event)
+    new_dest = (original_dest + 1) % len(fsm.states)
+
+    overlay.set(source, event, new_dest, overlay.output(source, event))
+    assert overlay.dest(source, event) == new_dest
+    assert overlay.materialise().dest_table[source, event] == new_dest
+    assert fsm.dest_table[source, event] == original_dest
+
+    # Setting the original value back leaves no edit behind
+    overlay.set(source, event, original_dest, overlay.output(source, event))
+    assert overlay.cells == {}
+
+
+def test_restore_undoes_edits(overlay: TableOverlay, fsm: LocalisationSystem):
+    """
+    Test that restoring a snapshot undoes every edit made after it.
+    """
+    snapshot = overlay.snapshot()
+    new = overlay.add_state("S3")
+    overlay.set(new, 0, 0, overlay.output_id("new"))
+    overlay.set(0, 0, new, 0)
+    overlay.remove_state(1)
+    assert overlay.materialise().states == ["S0", "S2", "S3"]
+
+    overlay.restore(snapshot)
+    assert overlay.states == list(range(len(fsm.states)))
+    assert overlay.outputs == fsm.outputs
+    assert overlay.materialise().transitions == fsm.transitions
+
+
+def test_remove_state_renumbers_table(overlay: TableOverlay, fsm: LocalisationSystem):
+    """
+    Test that removing a state drops its row and leaves transitions into it undefined.
+    """
+    overlay.remove_state(1)
+    dest_table, output_table = overlay.tables()
+    assert dest_table.shape == (len(fsm.states) - 1, len(fsm.events))
+    assert output_table.shape == dest_table.shape
+    assert np.all(dest_table < len(fsm.states) - 1)
+    assert set(overlay.incoming(1)) == {
+        (source, event)
+        for source, event in np.argwhere(fsm.dest_table == 1).tolist()
+        if source != 1
+    }
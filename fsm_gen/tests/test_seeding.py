@@ -0,0 +1,34 @@
+import numpy as np
+
+from fsm_gen.generator import FSMGenerator
+from fsm_gen.mutator import Mutator
+from fsm_gen.seeding import spawn_seeds, task_rngs
+
+
+def test_spawn_seeds():
+    """Test that spawned seeds are reproducible and independent."""
+    seeds = spawn_seeds(np.random.SeedSequence(42), 10)
+    assert seeds == spawn_seeds(np.random.SeedSequence(42), 10)
+    assert len(set(seeds)) == 10
+
+
+def test_task_rngs_independent():
+    """Test that the random number generators of a task produce different streams."""
+    generator_rng, mutator_rng, walk_rng = task_rngs(7)
+    draws = [[rng.random() for _ in range(5)] for rng in task_rngs(7)]
+    assert draws[0] != draws[1] != draws[2]
+    assert [generator_rng.random() for _ in range(5)] == draws[0]
+
+
+def test_task_replay():
+    """Test that a task seed reproduces the same FSM and mutant."""
+    fsms = []
+    mutants = []
+    for _ in range(2):
+        generator_rng, mutator_rng, _ = task_rngs(123)
+        fsm = FSMGenerator(8, 3, 3, rng=generator_rng)
+        mutants.append(Mutator(fsm, rng=mutator_rng).create_mutated_fsm())
+        fsms.append(fsm)
+
+    assert fsms[0].transitions == fsms[1].transitions
+    assert mutants[0].transitions == mutants[1].transitions
@@ -0,0 +1,123 @@
+import numpy as np
+
+from fsm_gen.generator import FSMGenerator
+
+
+class BatchRandomWalk:
+    """
+    Many independent random walks on a mutated FSM, advanced in lock-step over the transition
+    table. Each walker chooses uniformly among the events of its state, like the RANDOM walk of
+    RandomWalk, and the walk lengths for every target coverage come from a single batch.
+    """
+
+    def __init__(
+        self,
+        original_fsm: FSMGenerator,
+        mutated_fsm: FSMGenerator,
+        target_coverages: list[int],
+        rng: np.random.Generator = None,
+    ) -> None:
+        """
+        Create a batch walker for a mutated FSM and a list of target coverages.
+
+        Args:
+            original_fsm (FSMGenerator): the unmutated FSM to check the outputs of the walks against.
+            mutated_fsm (FSMGenerator): the FSM to perform the walks on.
+            target_coverages (list[int]): the target coverages of transitions to record the walk
+                lengths for, capped at 100.
+            rng (np.random.Generator): the random number generator to choose events with.
+        """
+        self.original_fsm = original_fsm
+        self.mutated_fsm = mutated_fsm
+        self.target_coverages = [min(target, 100) for target in target_coverages]
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.transitions_length = int(np.count_nonzero(mutated_fsm.dest_table != -1))
+        self.max_walk_length = len(original_fsm.states) ** 2 * len(original_fsm.events)
+
+    def walk(self, num_walkers: int) -> dict[str, np.ndarray]:
+        """
+        Perform independent random walks until each reaches every target coverage or exceeds the
+        maximum walk length.
+
+        Args:
+            num_walkers (int): the number of walks to perform.
+
+        Returns:
+            dict: the "walk_lengths" of each walk (row) for each target coverage (column), -1 if
+            the maximum walk length was exceeded first, and the "detected_fault_index" of each
+            walk for each target, as returned by RandomWalk.detected_fault.
+        """
+        dest_table = self.mutated_fsm.dest_table
+        output_table = self.mutated_fsm.output_table
+        original_dests = self.original_fsm.dest_table
+        original_outputs = self.original_fsm.output_table
+        num_events = dest_table.shape[1]
+
+        # The defined events of each state, left-aligned, to choose from by position
+        defined = dest_table != -1
+        num_choices = defined.sum(axis=1)
+        choices = np.argsort(~defined, axis=1, kind="stable")
+
+        # Targets are reached once ceil(target% of the transitions) have been covered, as in
+        # RandomWalk
+        thresholds = np.array(
+            [
+                max(-(-target * self.transitions_length // 100), target > 0)
+                for target in self.target_coverages
+            ],
+            dtype=np.int64,
+        )
+
+        states = np.zeros(num_walkers, np.int64)
+        original_states = np.zeros(num_walkers, np.int64)
+        covered = np.zeros((num_walkers, dest_table.size), bool)
+        num_covered = np.zeros(num_walkers, np.int64)
+        walk_lengths = np.where(thresholds == 0, 0, -1)[None, :].repeat(num_walkers, 0)
+        detected = np.full(num_walkers, -1, np.int64)
+        walkers = np.flatnonzero((walk_lengths == -1).any(axis=1))
+
+        for step in range(1, self.max_walk_length + 2):
+            if not len(walkers):
+                break
+
+            current = states[walkers]
+            if (num_choices[current] == 0).any():
+                raise IndexError("Cannot choose from a state without transitions")
+
+            events = choices[current, self.rng.integers(num_choices[current])]
+            outputs = output_table[current, events]
+
+            cells = current * num_events + events
+            num_covered[walkers] += ~covered[walkers, cells]
+            covered[walkers, cells] = True
+            states[walkers] = dest_table[current, events]
+
+            # Step the original FSM alongside, staying put on undefined transitions
+            original = original_states[walkers]
+            expected = original_outputs[original, events]
+            mismatch = ((expected == -1) | (expected != outputs)) & (
+                detected[walkers] == -1
+            )
+            detected[walkers[mismatch]] = step
+            original_dests_taken = original_dests[original, events]
+            original_states[walkers] = np.where(
+                original_dests_taken == -1, original, original_dests_taken
+            )
+
+            lengths = walk_lengths[walkers]
+            lengths[(lengths == -1) & (num_covered[walkers, None] >= thresholds)] = step
+            walk_lengths[walkers] = lengths
+            walkers = walkers[(lengths == -1).any(axis=1)]
+
+        detected_fault_index = np.where(
+            (walk_lengths != -1)
+            & (detected[:, None] != -1)
+            & (detected[:, None] <= walk_lengths),
+            detected[:, None],
+            -1,
+        )
+
+        return {
+            "walk_lengths": walk_lengths,
+            "detected_fault_index": detected_fault_index,
+        }
@@ -0,0 +1,170 @@
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+
+import numpy as np
+
+from fsm_gen.generator import FSMGenerator
+from walks.hsi import (
+    _generate_state_cover,
+    _generate_transition_cover,
+    generate_harmonised_state_identifiers,
+    generate_HSI_suite,
+)
+
+
+def fsm_hash(fsm: FSMGenerator) -> str:
+    """
+    Hash the transition table of a FSM. The HSI artefacts only depend on the table, so machines
+    with the same table share a hash whatever their state, event and output names.
+
+    Args:
+        fsm (FSMGenerator): the FSM to hash.
+
+    Returns:
+        str: the hexadecimal SHA-256 digest of the shape and contents of the table.
+    """
+    digest = hashlib.sha256()
+    digest.update(np.array(fsm.dest_table.shape, np.int64).tobytes())
+    digest.update(np.ascontiguousarray(fsm.dest_table, np.int32).tobytes())
+    digest.update(np.ascontiguousarray(fsm.output_table, np.int32).tobytes())
+    return digest.hexdigest()
+
+
+ARTEFACTS = ["state_cover", "transition_cover", "state_identifiers", "hsi_suite"]
+
+
+def _generate(fsm: FSMGenerator, artefacts: dict, name: str) -> object:
+    """
+    Get one HSI artefact of a FSM, generating it and the artefacts it is built from if missing.
+
+    Args:
+        fsm (FSMGenerator): the FSM to get the artefact of.
+        artefacts (dict): the artefacts generated so far, the missing ones are added to it.
+        name (str): the name of the artefact, one of ARTEFACTS.
+
+    Returns:
+        object: the artefact.
+    """
+    if name not in artefacts:
+        if name == "state_cover":
+            artefacts[name] = _generate_state_cover(fsm)
+        elif name == "transition_cover":
+            artefacts[name] = _generate_transition_cover(
+                fsm, _generate(fsm, artefacts, "state_cover")
+            )
+        elif name == "state_identifiers":
+            artefacts[name] = generate_harmonised_state_identifiers(fsm)
+        else:
+            artefacts[name] = generate_HSI_suite(
+                fsm,
+                _generate(fsm, artefacts, "state_identifiers"),
+                _generate(fsm, artefacts, "state_cover"),
+            )
+
+    return artefacts[name]
+
+
+class HSICache:
+    """
+    A least recently used cache of the HSI artefacts of FSMs, keyed by the hash of their
+    transition table and optionally kept on disk between runs.
+    """
+
+    def __init__(self, max_size: int = 128, directory: str = None) -> None:
+        """
+        Create an empty cache.
+
+        Args:
+            max_size (int): the number of FSMs to keep the artefacts of in memory.
+            directory (str): the directory to store the artefacts in as pickle files, or None to
+                only keep them in memory.
+        """
+        self.max_size = max_size
+        self.directory = directory
+        self._artefacts = OrderedDict()
+
+    def get(self, fsm: FSMGenerator) -> dict:
+        """
+        Get the HSI artefacts of a FSM, generating them only if they are not already cached.
+        The artefacts are shared between callers and must not be changed.
+
+        Args:
+            fsm (FSMGenerator): the FSM to get the artefacts of.
+
+        Returns:
+            dict: the "state_cover", "transition_cover", "state_identifiers" and "hsi_suite"
+            of the FSM.
+        """
+        return self._get(fsm, ARTEFACTS)
+
+    def get_state_identifiers(
+        self, fsm: FSMGenerator
+    ) -> dict[int, set[tuple[int, ...]]]:
+        """
+        Get the harmonised state identifiers of a FSM, without generating its HSI suite.
+
+        Args:
+            fsm (FSMGenerator): the FSM to get the state identifiers of.
+
+        Returns:
+            dict: the harmonised state identifiers of the FSM, keyed by state index.
+        """
+        return self._get(fsm, ["state_identifiers"])["state_identifiers"]
+
+    def _get(self, fsm: FSMGenerator, names: list[str]) -> dict:
+        """
+        Get the cached artefacts of a FSM, generating any of the given ones that are missing.
+
+        Args:
+            fsm (FSMGenerator): the FSM to get the artefacts of.
+            names (list[str]): the artefacts that must be present.
+
+        Returns:
+            dict: the artefacts of the FSM generated so far.
+        """
+        key = fsm_hash(fsm)
+
+        path = (
+            os.path.join(self.directory, f"{key}.pkl")
+            if self.directory is not None
+            else None
+        )
+
+        if key in self._artefacts:
+            self._artefacts.move_to_end(key)
+            artefacts = self._artefacts[key]
+        elif path is not None and os.path.exists(path):
+            with open(path, "rb") as f:
+                artefacts = pickle.load(f)
+        else:
+            artefacts = {}
+
+        if any(name not in artefacts for name in names):
+            for name in names:
+                _generate(fsm, artefacts, name)
+
+            if path is not None:
+                os.makedirs(self.directory, exist_ok=True)
+
+                # Write to a temporary file first so other processes never read a partial file
+                temporary_path = f"{path}.{os.getpid()}.tmp"
+                with open(temporary_path, "wb") as f:
+                    pickle.dump(artefacts, f)
+                os.replace(temporary_path, path)
+
+        self._artefacts[key] = artefacts
+        if len(self._artefacts) > self.max_size:
+            self._artefacts.popitem(last=False)
+
+        return artefacts
+
+    def clear(self) -> None:
+        """
+        Remove every FSM from the in-memory cache, leaving any files on disk.
+        """
+        self._artefacts.clear()
+
+
+hsi_cache = HSICache()
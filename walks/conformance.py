@@ -0,0 +1,342 @@
+import datetime
+from abc import ABC, abstractmethod
+from collections import defaultdict
+
+from fsm_gen.generator import FSMGenerator
+from walks.hsi import (
+    _add_to_trie,
+    _generate_state_cover,
+    _separating_sequences,
+    _suite_from_trie,
+)
+
+
+class TestSuiteGenerator(ABC):
+    """
+    A method of generating a conformance test suite for a FSM. Each method chooses the input
+    sequences to test from the same state cover and separating sequences, and the expected outputs
+    are computed once per prefix of the suite.
+    """
+
+    name = None
+
+    # Not a pytest test class, despite the name
+    __test__ = False
+
+    def generate(self, fsm: FSMGenerator) -> dict[tuple[int, ...], tuple[int, ...]]:
+        """
+        Generate the test suite for a FSM.
+
+        Args:
+            fsm (FSMGenerator): The FSM to generate the test suite for.
+
+        Returns:
+            dict: The test suite, mapping input sequences to output sequences (-1 where no output
+            is produced). No input sequence is a prefix of another.
+        """
+        state_cover = {
+            state: tuple(path) for state, path in _generate_state_cover(fsm).items()
+        }
+        transitions = [
+            (state, event, int(fsm.dest_table[state, event]))
+            for state in state_cover
+            for event in fsm._get_events(state)
+        ]
+        trie = self._build_trie(
+            fsm, state_cover, transitions, _separating_sequences(fsm)
+        )
+        return _suite_from_trie(fsm, trie)
+
+    def report(self, fsm: FSMGenerator) -> dict:
+        """
+        Generate the test suite for a FSM and measure it.
+
+        Args:
+            fsm (FSMGenerator): The FSM to generate the test suite for.
+
+        Returns:
+            dict: The "method", the "suite", its "size" (number of sequences), "total_length"
+            (number of inputs) and the "time_taken" to generate it.
+        """
+        start_time = datetime.datetime.now()
+        suite = self.generate(fsm)
+        end_time = datetime.datetime.now()
+
+        return {
+            "method": self.name,
+            "suite": suite,
+            "size": len(suite),
+            "total_length": sum(map(len, suite)),
+            "time_taken": end_time - start_time,
+        }
+
+    @abstractmethod
+    def _build_trie(
+        self,
+        fsm: FSMGenerator,
+        state_cover: dict[int, tuple[int, ...]],
+        transitions: list[tuple[int, int, int]],
+        separating_sequences: dict[tuple[int, int], tuple[int, ...]],
+    ) -> dict:
+        """
+        Choose the input sequences of the test suite.
+
+        Args:
+            fsm (FSMGenerator): The FSM to generate the test suite for.
+            state_cover (dict): The shortest input sequence reaching each reachable state.
+            transitions (list): The (source, event, dest) index triples of the transitions from
+                the reachable states.
+            separating_sequences (dict): The shortest separating sequence of each pair of
+                distinguishable states.
+
+        Returns:
+            dict: A trie of the chosen input sequences.
+        """
+
+
+class WMethod(TestSuiteGenerator):
+    """
+    The W method: every state and transition cover sequence followed by every sequence of the
+    characterisation set W, the union of all separating sequences.
+    """
+
+    name = "W"
+
+    def _build_trie(self, fsm, state_cover, transitions, separating_sequences):
+        characterisation_set = set(separating_sequences.values()) or {()}
+        trie = {}
+
+        paths = list(state_cover.values()) + [
+            state_cover[source] + (event,) for source, event, _ in transitions
+        ]
+        for path in paths:
+            for seq in characterisation_set:
+                _add_to_trie(trie, path + seq)
+
+        return trie
+
+
+class WpMethod(TestSuiteGenerator):
+    """
+    The Wp method: the state cover followed by the characterisation set W, and every other
+    transition cover sequence followed only by the identifier of the state it reaches.
+    """
+
+    name = "Wp"
+
+    def _build_trie(self, fsm, state_cover, transitions, separating_sequences):
+        characterisation_set = set(separating_sequences.values()) or {()}
+        identifiers = _identifiers(separating_sequences)
+        covers = set(state_cover.values())
+        trie = {}
+
+        for path in state_cover.values():
+            for seq in characterisation_set:
+                _add_to_trie(trie, path + seq)
+
+        for source, event, dest in transitions:
+            path = state_cover[source] + (event,)
+            if path not in covers:
+                for seq in identifiers.get(dest) or {()}:
+                    _add_to_trie(trie, path + seq)
+
+        return trie
+
+
+class HSIMethod(TestSuiteGenerator):
+    """
+    The HSI method as used by the random walk experiments, see generate_HSI_suite.
+    """
+
+    name = "HSI"
+
+    def _build_trie(self, fsm, state_cover, transitions, separating_sequences):
+        # Every state identifier follows every transition cover sequence
+        identifiers = set(separating_sequences.values())
+        trie = {}
+
+        for source, event, _ in transitions:
+            for seq in identifiers:
+                _add_to_trie(trie, state_cover[source] + (event,) + seq)
+
+        return trie
+
+
+class HMethod(TestSuiteGenerator):
+    """
+    The H method: rather than fixed identifiers, each pair of sequences that must reach different
+    states is separated on the fly, reusing a separating sequence already in the suite when it
+    costs less than adding the shortest one.
+    """
+
+    name = "H"
+
+    def _build_trie(self, fsm, state_cover, transitions, separating_sequences):
+        dests = fsm.dest_table.tolist()
+        outputs = fsm.output_table.tolist()
+        trie = {}
+
+        for path in state_cover.values():
+            _add_to_trie(trie, path)
+        for source, event, _ in transitions:
+            _add_to_trie(trie, state_cover[source] + (event,))
+
+        # The state cover sequences must be told apart from each other, and each transition
+        # sequence from the state cover sequences of every state other than the one it reaches
+        covers = list(state_cover.items())
+        pairs = [
+            (path1, state1, path2, state2)
+            for i, (state1, path1) in enumerate(covers)
+            for state2, path2 in covers[i + 1 :]
+        ]
+        pairs += [
+            (state_cover[source] + (event,), dest, cover, state)
+            for source, event, dest in transitions
+            for state, cover in covers
+            if state != dest
+        ]
+
+        used = {}
+        for path1, state1, path2, state2 in pairs:
+            pair = (min(state1, state2), max(state1, state2))
+
+            # Equivalent states cannot be told apart
+            if pair not in separating_sequences:
+                continue
+
+            candidates = [
+                seq for seq in used if _separates(dests, outputs, state1, state2, seq)
+            ] + [separating_sequences[pair]]
+            seq = min(
+                candidates,
+                key=lambda seq: _cost(trie, path1 + seq) + _cost(trie, path2 + seq),
+            )
+
+            _add_to_trie(trie, path1 + seq)
+            _add_to_trie(trie, path2 + seq)
+            used[seq] = None
+
+        return trie
+
+
+class SPYMethod(TestSuiteGenerator):
+    """
+    The SPY method: like HSI, but the identifiers of the state a transition reaches are spread
+    over sequences that converge to the transition's source state, wherever they extend the suite
+    the least.
+    """
+
+    name = "SPY"
+
+    def _build_trie(self, fsm, state_cover, transitions, separating_sequences):
+        identifiers = _identifiers(separating_sequences)
+        covers = set(state_cover.values())
+        trie = {}
+
+        # Sequences known to reach each state, starting with its state cover sequence
+        convergent = {state: [path] for state, path in state_cover.items()}
+
+        for state, path in state_cover.items():
+            for seq in identifiers.get(state) or {()}:
+                _add_to_trie(trie, path + seq)
+
+        for source, event, dest in transitions:
+            if state_cover[source] + (event,) in covers:
+                continue
+
+            dest_identifier = sorted(identifiers.get(dest) or {()})
+            paths = [path + (event,) for path in convergent[source]]
+            for seq in dest_identifier:
+                path = min(paths, key=lambda path: _cost(trie, path + seq))
+                _add_to_trie(trie, path + seq)
+
+            # A sequence is only known to reach the state once its whole identifier follows it
+            for path in paths:
+                if all(_cost(trie, path + seq) == 0 for seq in dest_identifier):
+                    convergent[dest].append(path)
+
+        return trie
+
+
+def _identifiers(
+    separating_sequences: dict[tuple[int, int], tuple[int, ...]],
+) -> dict[int, set[tuple[int, ...]]]:
+    """
+    Harmonise the separating sequences into state identifiers, as in
+    generate_harmonised_state_identifiers.
+
+    Args:
+        separating_sequences (dict): The separating sequence of each pair of states.
+
+    Returns:
+        dict: The identifier of each state, keyed by state index.
+    """
+    state_identifiers = defaultdict(set)
+
+    for (s1, s2), seq in separating_sequences.items():
+        state_identifiers[s1].add(seq)
+        state_identifiers[s2].add(seq)
+
+    return state_identifiers
+
+
+def _cost(trie: dict, sequence: tuple[int, ...]) -> int:
+    """
+    Count the inputs that adding a sequence would add to the suite. Extending an existing test
+    only adds the new inputs, while branching off one adds a new test that repeats the prefix.
+
+    Args:
+        trie (dict): The root of the trie of the suite.
+        sequence (tuple): The event indices to add.
+
+    Returns:
+        int: The number of inputs added to the suite.
+    """
+    node = trie
+    depth = 0
+
+    for event in sequence:
+        if event not in node:
+            break
+        node = node[event]
+        depth += 1
+
+    if depth == len(sequence):
+        return 0
+
+    return len(sequence) - depth + (depth if node else 0)
+
+
+def _separates(
+    dests: list[list[int]],
+    outputs: list[list[int]],
+    state1: int,
+    state2: int,
+    sequence: tuple[int, ...],
+) -> bool:
+    """
+    Check whether an input sequence produces different outputs from two states.
+
+    Args:
+        dests (list): The destination table of the FSM as lists.
+        outputs (list): The output table of the FSM as lists.
+        state1 (int): The index of the first state.
+        state2 (int): The index of the second state.
+        sequence (tuple): The event indices to apply.
+
+    Returns:
+        bool: Whether the outputs differ at any step.
+    """
+    for event in sequence:
+        if outputs[state1][event] != outputs[state2][event]:
+            return True
+
+        # An undefined transition leaves the machine in the same state
+        dest1, dest2 = dests[state1][event], dests[state2][event]
+        state1 = state1 if dest1 == -1 else dest1
+        state2 = state2 if dest2 == -1 else dest2
+
+    return False
+
+
+TEST_SUITE_GENERATORS = [WMethod(), WpMethod(), HSIMethod(), HMethod(), SPYMethod()]
@@ -1,110 +1,158 @@
-import itertools
 from collections import defaultdict
 
+import numpy as np
+
 from fsm_gen.generator import FSMGenerator
 
 
-def _find_shortest_path(fsm: FSMGenerator, end: str) -> list:
+def _find_shortest_path(fsm: FSMGenerator, end: int) -> list[int] | None:
     """
     Find the shortest path from the initial state to the end state.
 
     Args:
         fsm (FSMGenerator): the FSM to find the shortest path in
-        end (str): the end state
+        end (int): the index of the end state
 
     Returns:
-        list: the shortest path from the initial state to the end state
+        list: the event indices on the shortest path from the initial state to the end state,
+        None if the end state cannot be reached
     """
-    queue = [(fsm.states[0], [])]
-
-    while queue:
-        (state, path) = queue.pop(0)
-        transitions = fsm._get_transitions(source=state)
-
-        for transition in transitions:
-            inp = transition["trigger"].split(" / ")[0]
-            next_state = transition["dest"]
+    return _generate_state_cover(fsm).get(end)
 
-            if state == end:
-                return path
-            if next_state == end:
-                return path + [inp]
-            else:
-                queue.append((next_state, path + [inp]))
 
-
-def _generate_state_cover(fsm: FSMGenerator) -> dict[str, list[str]]:
+def _generate_state_cover(fsm: FSMGenerator) -> dict[int, list[int]]:
     """
-    Generate the state cover for the FSM.
+    Generate the state cover for the FSM from a single breadth-first search of the initial state,
+    recording the state and event each state is first reached from.
 
     Args:
         fsm (FSMGenerator): the FSM to generate the state cover for
 
     Returns:
-        dict: the state cover for the FSM
+        dict: the state cover for the FSM, keyed by the index of each reachable state
     """
-    state_cover = {}
-    for state in fsm.states[1:]:
-        state_cover[state] = _find_shortest_path(fsm, state)
+    dests = fsm.dest_table.tolist()
+    parent = [-1] * len(dests)
+    parent_event = [-1] * len(dests)
+    parent[0] = 0
+    order = [0]
+
+    # The order list doubles as the queue of the search
+    for state in order:
+        for event, dest in enumerate(dests[state]):
+            if dest != -1 and parent[dest] == -1:
+                parent[dest] = state
+                parent_event[dest] = event
+                order.append(dest)
+
+    state_cover = {0: []}
+    for state in order[1:]:
+        state_cover[state] = state_cover[parent[state]] + [parent_event[state]]
 
-    state_cover[fsm.states[0]] = []
     return state_cover
 
 
-def _generate_transition_cover(fsm: FSMGenerator) -> set[str]:
+def _generate_transition_cover(
+    fsm: FSMGenerator, state_cover: dict[int, list[int]]
+) -> set[tuple[int, ...]]:
     """
-    Generate the transition cover for the FSM.
+    Generate the transition cover for the FSM, extending the state cover by every transition.
+
+    Args:
+        fsm (FSMGenerator): The FSM to generate the transition cover for.
+        state_cover (dict): The state cover of the FSM, as returned by _generate_state_cover.
 
     Returns:
-        set: the transition cover for the FSM
+        set: the transition cover for the FSM as tuples of event indices
     """
-    state_cover = _generate_state_cover(fsm)
     transition_cover = set()
 
-    for state in fsm.states:
-        transitions = fsm._get_transitions(source=state)
-        for transition in transitions:
-            inp = transition["trigger"].split(" / ")[0]
-            transition_cover.add("".join(state_cover[state] + [inp]))
+    for state, path in state_cover.items():
+        for inp in fsm._get_events(state):
+            transition_cover.add(tuple(path + [inp]))
 
     return transition_cover
 
 
-def generate_harmonised_state_identifiers(fsm: FSMGenerator) -> dict[str, set[str]]:
+def _separating_sequences(
+    fsm: FSMGenerator,
+) -> dict[tuple[int, int], tuple[int, ...]]:
     """
-    Generate a harmonised set of state identifiers for the FSM.
+    Find a shortest separating sequence for every pair of distinguishable states. Pairs separated
+    by a single input are found first, then each round separates the pairs that an input leads to a
+    pair separated in the round before, until no more pairs can be separated.
 
     Args:
-        fsm (FSMGenerator): The FSM to generate state identifiers for.
-        max_seqs_per_state (int): The maximum number of distinguishing sequences per state.
+        fsm (FSMGenerator): The FSM to separate the states of.
 
     Returns:
-        dict: A harmonised set of state identifiers for the FSM.
+        dict: The lexicographically smallest of the shortest separating sequences as event
+        indices, keyed by (s1, s2) state index pairs with s1 < s2.
     """
-    max_len = 5
-    state_identifiers = defaultdict(set)
-    state_pairs = [
-        (s1, s2) for i, s1 in enumerate(fsm.states) for s2 in fsm.states[i + 1 :]
-    ]
-    test_sequences = [
-        "".join(seq)
-        for length in range(1, max_len + 1)
-        for seq in itertools.product(fsm.events, repeat=length)
-    ]
+    num_states = len(fsm.states)
+    state_pairs = np.stack(np.triu_indices(num_states, 1), axis=1)
+
+    # An undefined transition produces no output and leaves the machine in the same state
+    dests = np.where(
+        fsm.dest_table == -1, np.arange(num_states)[:, None], fsm.dest_table
+    )
+
+    # The length of the separating sequence of each pair (0 if not yet separated) and its first event
+    lengths = np.zeros((num_states, num_states), np.int32)
+    first_events = np.zeros((num_states, num_states), np.int32)
+
+    separates = (
+        fsm.output_table[state_pairs[:, 0]] != fsm.output_table[state_pairs[:, 1]]
+    )
+    length = 1
+
+    while len(state_pairs):
+        separated = separates.any(axis=1)
+        if not separated.any():
+            break
+
+        s1, s2 = state_pairs[separated].T
+        events = separates[separated].argmax(axis=1)
+        lengths[s1, s2] = lengths[s2, s1] = length
+        first_events[s1, s2] = first_events[s2, s1] = events
+
+        state_pairs = state_pairs[~separated]
+        separates = (
+            lengths[dests[state_pairs[:, 0]], dests[state_pairs[:, 1]]] == length
+        )
+        length += 1
 
     separating_sequences = {}
+    for s1, s2 in np.argwhere(np.triu(lengths) > 0).tolist():
+        sequence = []
+        state1, state2 = s1, s2
 
-    for s1, s2 in state_pairs:
-        for seq in test_sequences:
-            _, output1 = fsm.apply_input_sequence(s1, seq)
-            _, output2 = fsm.apply_input_sequence(s2, seq)
+        while len(sequence) < lengths[s1, s2]:
+            event = int(first_events[state1, state2])
+            sequence.append(event)
+            state1, state2 = dests[state1, event], dests[state2, event]
+
+        separating_sequences[(s1, s2)] = tuple(sequence)
+
+    return separating_sequences
+
+
+def generate_harmonised_state_identifiers(
+    fsm: FSMGenerator,
+) -> dict[int, set[tuple[int, ...]]]:
+    """
+    Generate a harmonised set of state identifiers for the FSM.
+
+    Args:
+        fsm (FSMGenerator): The FSM to generate state identifiers for.
 
-            if output1 != output2:
-                separating_sequences[(s1, s2)] = seq
-                break  # Stop after finding one separating sequence
+    Returns:
+        dict: A harmonised set of state identifiers for the FSM, keyed by state index.
+    """
+    state_identifiers = defaultdict(set)
 
     # Apply harmonisation: Use the same separating sequence across state identifiers
-    for (s1, s2), seq in separating_sequences.items():
+    for (s1, s2), seq in _separating_sequences(fsm).items():
         state_identifiers[s1].add(seq)
         state_identifiers[s2].add(seq)
 
@@ -112,34 +160,84 @@ def generate_harmonised_state_identifiers(fsm: FSMGenerator) -> dict[str, set[st
 
 
 def generate_HSI_suite(
-    fsm: FSMGenerator, state_identifiers: dict[str, set[str]]
-) -> dict[str, tuple[str]]:
+    fsm: FSMGenerator,
+    state_identifiers: dict[int, set[tuple[int, ...]]],
+    state_cover: dict[int, list[int]] = None,
+) -> dict[tuple[int, ...], tuple[int, ...]]:
     """
     Generate the HSI test set for the FSM using the HSI method.
 
     Args:
         fsm (FSMGenerator): The FSM to generate the HSI test set for.
+        state_identifiers (dict): The harmonised state identifiers of the FSM.
+        state_cover (dict): The state cover of the FSM, generated if not given.
 
     Returns:
-        set: The HSI test set for the FSM.
+        dict: The HSI test set for the FSM, mapping input sequences to output sequences
+        (-1 where no output is produced). No input sequence is a prefix of another.
     """
-    transition_cover = _generate_transition_cover(fsm)
-    hsi_test_set = defaultdict(tuple)
+    if state_cover is None:
+        state_cover = _generate_state_cover(fsm)
+    transition_cover = _generate_transition_cover(fsm, state_cover)
 
+    # Share common prefixes in a trie of event indices
+    trie = {}
     for seq in transition_cover:
-        for state, identifiers in state_identifiers.items():
-            for identifer in identifiers:
-                sequence = seq + identifer
-                hsi_test_set[sequence] = fsm.apply_input_sequence(
-                    fsm.machine.initial, sequence
-                )[1]
-
-    # Remove all keys that are prefixes of other keys
-    keys = list(hsi_test_set.keys())
-    for i, key in enumerate(keys):
-        for j in range(i + 1, len(keys)):
-            if keys[j].startswith(key):
-                hsi_test_set.pop(key)
-                break
-
-    return hsi_test_set
+        for identifiers in state_identifiers.values():
+            for identifier in identifiers:
+                _add_to_trie(trie, seq + identifier)
+
+    return _suite_from_trie(fsm, trie)
+
+
+def _add_to_trie(trie: dict, sequence: tuple[int, ...]) -> None:
+    """
+    Add an input sequence to a trie of event indices.
+
+    Args:
+        trie (dict): The root of the trie, each node maps event indices to child nodes.
+        sequence (tuple): The event indices to add.
+    """
+    node = trie
+    for event in sequence:
+        node = node.setdefault(event, {})
+
+
+def _suite_from_trie(
+    fsm: FSMGenerator, trie: dict
+) -> dict[tuple[int, ...], tuple[int, ...]]:
+    """
+    Walk a trie of input sequences from the initial state, computing each output once per node and
+    keeping only the leaves, so that no sequence is a prefix of another.
+
+    Args:
+        fsm (FSMGenerator): The FSM to compute the outputs with.
+        trie (dict): The root of the trie, each node maps event indices to child nodes.
+
+    Returns:
+        dict: The maximal input sequences of the trie mapped to their output sequences
+        (-1 where no output is produced).
+    """
+    dests = fsm.dest_table.tolist()
+    outputs = fsm.output_table.tolist()
+    suite = {}
+
+    stack = [(trie, 0, (), ())]
+    while stack:
+        node, state, sequence, output = stack.pop()
+
+        if not node and sequence:
+            suite[sequence] = output
+
+        for event in sorted(node, reverse=True):
+            dest = dests[state][event]
+            stack.append(
+                (
+                    node[event],
+                    state if dest == -1 else dest,
+                    sequence + (event,),
+                    output + (outputs[state][event],),
+                )
+            )
+
+    return suite
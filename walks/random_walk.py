@@ -1,14 +1,24 @@
 import random
-from collections import defaultdict
+from bisect import bisect
+from collections import OrderedDict, defaultdict
 from enum import Enum
+from itertools import accumulate
+
+import numpy as np
 
 from fsm_gen.generator import FSMGenerator
-from walks.hsi import generate_harmonised_state_identifiers
+from walks.cache import fsm_hash, hsi_cache
 
 """
 A class to perform different types of (often random) walks on a given FSM.
 """
 
+# The event probabilities of the statistical walk for the least recently used original FSMs,
+# keyed by fsm_hash, with the cumulative weights built from them for each state and its events.
+# Walks on different mutants of the same FSM share them.
+EVENT_WEIGHTS_CACHE_SIZE = 128
+_event_weights = OrderedDict()
+
 
 class RandomWalk:
     class WalkType(Enum):
@@ -24,30 +34,38 @@ class RandomWalk:
         self,
         original_fsm: FSMGenerator,
         mutated_fsm: FSMGenerator,
-        target_coverage: int,
+        target_coverage: int | list[int],
         HSI_suite: dict,
+        rng: random.Random = None,
     ) -> None:
         """
         Create a walker instance for a given FSM and target coverage.
 
         Args:
             fsm (FSMGenerator): the (mutated) FSM to perform the walks on.
-            target_coverage (int): the target coverage of transitions to reach during walks.
+            target_coverage (int | list[int]): the target coverage of transitions to reach during
+                walks, or a list of them to walk to the highest of and record with walk_milestones.
             HSI_suite (dict): the HSI suite for the unmutated FSM (ways to distinguish states).
+            rng (random.Random): the random number generator to choose triggers with.
         """
         self.original_fsm = original_fsm
         self.mutated_fsm = mutated_fsm
-        self.transitions_length = len(mutated_fsm.transitions)
-        if target_coverage > 100:
-            self.target_coverage = 100
-        else:
-            self.target_coverage = target_coverage
+        self.transitions_length = int(np.count_nonzero(mutated_fsm.dest_table != -1))
+        targets = (
+            target_coverage if isinstance(target_coverage, list) else [target_coverage]
+        )
+        self.target_coverages = [min(target, 100) for target in targets]
+        self.target_coverage = max(self.target_coverages)
         self.HSI_suite = HSI_suite
+        self.rng = rng if rng is not None else random.Random()
         self.max_walk_length = len(self.original_fsm.states) ** 2 * len(
             self.original_fsm.events
         )
+        self._cumulative_weights = None
+        self._walk = []
+        self._resets = []
 
-    def walk(self, walk_type: WalkType, step_limit: int = 5) -> list[str]:
+    def walk(self, walk_type: WalkType, step_limit: int = 5) -> list[tuple[int, int]]:
         """
         Perform a specific type of walk on the FSM and return its length.
 
@@ -56,9 +74,29 @@ class RandomWalk:
             step_limit (int): number of steps away from an identified state before resetting.
 
         Returns:
-            int: length of the walk performed in order to meet the target coverage.
+            list: the (event, output) index pairs of the walk performed in order to meet
+            the target coverage, or -1 if the maximum walk length was exceeded.
         """
-        self.mutated_fsm.machine.state = self.mutated_fsm.machine.initial
+        # Step on plain lists of the transition table rather than the graph machine
+        self._dests = self.mutated_fsm.dest_table.tolist()
+        self._outputs = self.mutated_fsm.output_table.tolist()
+        self._events = [
+            self.mutated_fsm._get_events(state)
+            for state in range(len(self.mutated_fsm.states))
+        ]
+
+        # Transitions are covered in a bytearray indexed by state * num_events + event, and the
+        # target is reached once ceil(target_coverage% of the transitions) have been covered
+        self._num_events = len(self.mutated_fsm.events)
+        self._num_cells = len(self.mutated_fsm.states) * self._num_events
+        self._coverage_threshold = self._get_coverage_threshold(self.target_coverage)
+
+        # The walk so far, the length it had when each transition was first covered and the
+        # lengths at which it was reset to the initial state
+        self._walk = []
+        self._coverage_steps = []
+        self._resets = []
+
         if walk_type == self.WalkType.RANDOM:
             result = self._random_walk()
         elif walk_type == self.WalkType.RANDOM_WITH_RESET:
@@ -69,226 +107,372 @@ class RandomWalk:
             result = self._statistical_walk()
         return result
 
-    def _calculate_event_probabilities(self) -> dict[str, dict[str, float]]:
+    def walk_milestones(
+        self, walk_type: WalkType, step_limit: int = 5
+    ) -> dict[int, dict[str, int]]:
+        """
+        Perform a single walk to the highest target coverage, recording where it passes each of
+        the target coverages on the way.
+
+        Args:
+            walk_type (WalkType): the type of walk to perform on the FSM.
+            step_limit (int): number of steps away from an identified state before resetting.
+
+        Returns:
+            dict: the "walk_len" (-1 if the maximum walk length was exceeded first) and
+            "detected_fault_index" of the walk up to each target coverage, keyed by target.
+        """
+        self.walk(walk_type, step_limit)
+        detected_fault = (
+            self.detected_fault(self._walk, self._resets) if self._walk else -1
+        )
+        milestones = {}
+
+        for target in self.target_coverages:
+            threshold = self._get_coverage_threshold(target)
+
+            if threshold == 0:
+                walk_len = 0
+            elif threshold <= len(self._coverage_steps):
+                walk_len = self._coverage_steps[threshold - 1]
+            else:
+                walk_len = -1
+
+            milestones[target] = {
+                "walk_len": walk_len,
+                "detected_fault_index": (
+                    detected_fault if -1 < detected_fault <= walk_len else -1
+                ),
+            }
+
+        return milestones
+
+    def _get_coverage_threshold(self, target_coverage: int) -> int:
+        """
+        Get the number of transitions to cover to reach a target coverage.
+
+        Args:
+            target_coverage (int): the target coverage of transitions.
+
+        Returns:
+            int: ceil(target_coverage% of the transitions), at least one for a positive target.
+        """
+        return max(
+            -(-target_coverage * self.transitions_length // 100), target_coverage > 0
+        )
+
+    def _step(self, state: int, event: int) -> tuple[int, int]:
+        """
+        Fire the transition for an event from the current state of the mutated FSM.
+
+        Args:
+            state (int): the index of the current state.
+            event (int): the index of the event to fire.
+
+        Returns:
+            tuple: the index of the next state and the index of the output produced.
+        """
+        return self._dests[state][event], self._outputs[state][event]
+
+    def _calculate_event_probabilities(self) -> dict[int, dict[int, float]]:
         """
         Assign a probability to each event at each state based on the number of
         occurrences of the event in the HSI set for that state. The more often an event
         occurs in the HSI set, the more likely it is to be chosen during a walk.
 
         Returns:
-            dict[str, dict[str, float]]: a dictionary of dictionaries containing the
-            probabilities of each event at each state.
+            dict[int, dict[int, float]]: a dictionary of dictionaries containing the
+            probabilities of each event index at each state index of the original FSM.
         """
         state_event_probabilities = defaultdict(dict)
-        state_identifiers = generate_harmonised_state_identifiers(self.original_fsm)
+        state_identifiers = hsi_cache.get_state_identifiers(self.original_fsm)
+        events = range(len(self.original_fsm.events))
 
-        for state in self.original_fsm.states:
-            seqs = state_identifiers[state]
-            char_count = defaultdict(int)
+        for state in range(len(self.original_fsm.states)):
+            seqs = state_identifiers.get(state, ())
+            event_count = defaultdict(int)
             for seq in seqs:
-                for char in seq:
-                    char_count[char] += 1
+                for event in seq:
+                    event_count[event] += 1
 
-            char_sum = sum(char_count.values())
-            for event in self.original_fsm.events:
-                if event not in char_count.keys():
-                    char_sum += 1
+            event_sum = sum(event_count.values())
+            for event in events:
+                if event not in event_count.keys():
+                    event_sum += 1
 
-            for event in self.original_fsm.events:
-                if event in char_count.keys():
+            for event in events:
+                if event in event_count.keys():
                     state_event_probabilities[state][event] = (
-                        char_count[event] / char_sum
+                        event_count[event] / event_sum
                     )
                 else:
-                    state_event_probabilities[state][event] = 1 / char_sum
+                    state_event_probabilities[state][event] = 1 / event_sum
 
         return state_event_probabilities
 
-    def _statistical_walk(self) -> int:
+    def _get_cumulative_weights(self) -> list[list[float] | None]:
         """
-        Navigate a FSM with randomly assigned probability for each input at any
-        state. Some transitions are more likely to be explored than others.
+        Get the cumulative probabilities of the events of each state of the mutated FSM, so that
+        each step of a statistical walk is a single bisection. They are built once per walker
+        from the event probabilities cached for the original FSM.
 
         Returns:
-            int: length of the walk performed in order to meet the target coverage.
+            list: the running totals of the probabilities of the events of each state, in the
+            order of its events, or None for states the original FSM does not have.
         """
-        transitions_executed = set()
-        coverage = 0
-        state = self.mutated_fsm.machine.initial
-        walk = []
+        if self._cumulative_weights is None:
+            key = fsm_hash(self.original_fsm)
+            if key in _event_weights:
+                _event_weights.move_to_end(key)
+            else:
+                _event_weights[key] = (self._calculate_event_probabilities(), {})
+                if len(_event_weights) > EVENT_WEIGHTS_CACHE_SIZE:
+                    _event_weights.popitem(last=False)
+            state_event_probabilities, cumulative_weights = _event_weights[key]
+
+            # Probabilities are computed on the original FSM, so match states up by name
+            self._cumulative_weights = []
+            for state, name in enumerate(self.mutated_fsm.states):
+                original_state = self.original_fsm._state_index.get(name)
+                if original_state is None:
+                    self._cumulative_weights.append(None)
+                    continue
+
+                events = tuple(self._events[state])
+                if (original_state, events) not in cumulative_weights:
+                    probabilities = state_event_probabilities[original_state]
+                    cumulative_weights[original_state, events] = list(
+                        accumulate(probabilities[e] for e in events)
+                    )
+                self._cumulative_weights.append(
+                    cumulative_weights[original_state, events]
+                )
 
-        state_event_probabilities = self._calculate_event_probabilities()
+        return self._cumulative_weights
 
-        while coverage < self.target_coverage:
+    def _statistical_walk(self) -> list[tuple[int, int]]:
+        """
+        Navigate a FSM with randomly assigned probability for each input at any
+        state. Some transitions are more likely to be explored than others.
+
+        Returns:
+            list: the (event, output) index pairs of the walk performed in order to meet
+            the target coverage.
+        """
+        covered = bytearray(self._num_cells)
+        num_covered = 0
+        state = 0
+        walk = self._walk
+        coverage_steps = self._coverage_steps
+        cumulative_weights = self._get_cumulative_weights()
+
+        while num_covered < self._coverage_threshold:
             if len(walk) > self.max_walk_length:
                 return -1
 
-            triggers = self.mutated_fsm._get_triggers(state)
-            try:
-                trigger = random.choices(
-                    triggers,
-                    weights=[
-                        state_event_probabilities[state][t.split(" / ")[0]]
-                        for t in triggers
-                    ],
-                )[0]
-
-            except KeyError:
-                trigger = random.choice(triggers)
+            events = self._events[state]
+            cumulative = cumulative_weights[state]
+            # States added by mutation have no probabilities, so fall back to uniform
+            if cumulative is None:
+                event = self.rng.choice(events)
+            else:
+                # Draw the same way as random.choices, from a single random number
+                event = events[
+                    bisect(
+                        cumulative,
+                        self.rng.random() * cumulative[-1],
+                        0,
+                        len(cumulative) - 1,
+                    )
+                ]
 
-            self.mutated_fsm.machine.trigger(trigger)
-            transitions_executed.add(f"{state}->{trigger}")
-            walk.append(trigger)
+            next_state, output = self._step(state, event)
+            walk.append((event, output))
+            cell = state * self._num_events + event
+            if not covered[cell]:
+                covered[cell] = 1
+                num_covered += 1
+                coverage_steps.append(len(walk))
 
-            state = self.mutated_fsm.machine.state
-            coverage = len(transitions_executed) / self.transitions_length * 100
+            state = next_state
 
         return walk
 
-    def _limited_self_loop_walk(self) -> int:
+    def _limited_self_loop_walk(self) -> list[tuple[int, int]]:
         """
         Navigate a FSM with uniform probability for each trigger at any state.
         Stores self-loop transitions whenever they are encountered and avoids using them in
         future in order to aid progression.
 
         Returns:
-            int: length of the walk performed in order to meet the target coverage.
+            list: the (event, output) index pairs of the walk performed in order to meet
+            the target coverage.
         """
-        transitions_executed = set()
-        coverage = 0
-        state = self.mutated_fsm.machine.initial
-        walk = []
-        self_loop_triggers = []
-
-        while coverage < self.target_coverage:
+        covered = bytearray(self._num_cells)
+        num_covered = 0
+        state = 0
+        walk = self._walk
+        coverage_steps = self._coverage_steps
+        self_loop_triggers = set()
+
+        while num_covered < self._coverage_threshold:
             if len(walk) > self.max_walk_length:
                 return -1
 
-            triggers = self.mutated_fsm._get_triggers(state)
+            events = self._events[state]
 
-            # Limit triggers to those that are not already explored self-loops
-            triggers_excluding_self_loops = [
-                t for t in triggers if [state, t] not in self_loop_triggers
+            # Limit events to those that are not already explored self-loops
+            events_excluding_self_loops = [
+                e for e in events if (state, e) not in self_loop_triggers
             ]
-            if len(triggers_excluding_self_loops) != 0:
-                trigger = random.choice(triggers_excluding_self_loops)
+            if len(events_excluding_self_loops) != 0:
+                event = self.rng.choice(events_excluding_self_loops)
             # Fallback incase only option is to self-loop (theoretically impossible in connected machine)
             else:
-                trigger = random.choice(triggers)
-            previous_state = self.mutated_fsm.machine.state
-
-            self.mutated_fsm.machine.trigger(trigger)
-            transitions_executed.add(f"{state}->{trigger}")
-            walk.append(trigger)
+                event = self.rng.choice(events)
 
-            state = self.mutated_fsm.machine.state
-            current_state = self.mutated_fsm.machine.state
+            next_state, output = self._step(state, event)
+            walk.append((event, output))
+            cell = state * self._num_events + event
+            if not covered[cell]:
+                covered[cell] = 1
+                num_covered += 1
+                coverage_steps.append(len(walk))
 
-            # Record presence of a self-loop and the trigger it is associated with
-            if (
-                previous_state == current_state
-                and [state, trigger] not in self_loop_triggers
-            ):
-                self_loop_triggers.append([state, trigger])
+            # Record presence of a self-loop and the event it is associated with
+            if next_state == state:
+                self_loop_triggers.add((state, event))
 
-            coverage = len(transitions_executed) / self.transitions_length * 100
+            state = next_state
 
         return walk
 
-    def _random_walk_with_reset(self, step_limit: int) -> int:
+    def _build_hsi_trie(self) -> dict:
+        """
+        Compile the HSI suite into a trie of (event, output) pairs, so that a walk can be matched
+        against every sequence at once by following one edge per step.
+
+        Returns:
+            dict: the root of the trie, each node maps (event, output) pairs to child nodes and
+            marks the end of a sequence with a None key.
+        """
+        trie = {}
+
+        for input_seq, outputs in self.HSI_suite.items():
+            node = trie
+            for pair in zip(input_seq, outputs):
+                node = node.setdefault(pair, {})
+            node[None] = True
+
+        return trie
+
+    def _random_walk_with_reset(self, step_limit: int) -> list[tuple[int, int]]:
         """
         Navigate a FSM with uniform probability for each trigger at any state.
         If a state has not been identified through the HSI set for a certain number of steps, the
-        machine resets to its initial state.
+        machine resets to its initial state. The walk since the last reset identifies its states
+        once it starts with a sequence of the HSI suite and the outputs it is expected to produce.
 
         Args:
             step_limit (int): number of steps away from an identified state before resetting.
 
         Returns:
-            int: length of the walk performed in order to meet the target coverage.
+            list: the (event, output) index pairs of the walk performed in order to meet
+            the target coverage.
         """
-        walk = []
-        walk_since_reset = []
+        walk = self._walk
+        coverage_steps = self._coverage_steps
         steps_since_identification = 0
-        coverage = 0
-        state = self.mutated_fsm.machine.initial
-        transitions_executed = set()
+        covered = bytearray(self._num_cells)
+        num_covered = 0
+        state = 0
+
+        # The node of the trie reached by the walk since the last reset, None once it has left
+        # every sequence of the suite
+        trie = self._build_hsi_trie()
+        node = trie
+        identified = False
 
-        while coverage < self.target_coverage:
+        while num_covered < self._coverage_threshold:
             if len(walk) > self.max_walk_length:
                 return -1
 
-            triggers = self.mutated_fsm._get_triggers(state)
-            trigger = random.choice(triggers)
-
-            self.mutated_fsm.machine.trigger(trigger)
-            transitions_executed.add(f"{state}->{trigger}")
-            walk.append(trigger)
-            walk_since_reset.append(f"{state}->{trigger}")
-
-            for index, input_seq in enumerate(self.HSI_suite.keys()):
-                io_sequence = {}
-                key = ""
-                outputs = ()
-                for pair in walk_since_reset[: len(input_seq)]:
-                    io = pair.split("->")[1].split(" / ")
-                    key += str(io[0])
-                    outputs += (io[1],)
-                io_sequence[key] = outputs
-
-                if (
-                    key in self.HSI_suite.keys()
-                    and io_sequence[key] == self.HSI_suite[input_seq]
-                ):
-                    break
-                elif index == len(self.HSI_suite):
+            event = self.rng.choice(self._events[state])
+
+            next_state, output = self._step(state, event)
+            walk.append((event, output))
+            cell = state * self._num_events + event
+            if not covered[cell]:
+                covered[cell] = 1
+                num_covered += 1
+                coverage_steps.append(len(walk))
+            state = next_state
+
+            if not identified:
+                node = node.get((event, output)) if node is not None else None
+                identified = node is not None and None in node
+
+                if not identified:
                     steps_since_identification += 1
 
             if steps_since_identification >= step_limit:
-                self.mutated_fsm.machine.state = self.mutated_fsm.machine.initial
-                walk_since_reset = []
+                self._resets.append(len(walk))
+                state = 0
+                node = trie
+                identified = False
                 steps_since_identification = 0
 
-            state = self.mutated_fsm.machine.state
-            coverage = len(transitions_executed) / self.transitions_length * 100
-
         return walk
 
-    def _random_walk(self) -> int:
+    def _random_walk(self) -> list[tuple[int, int]]:
         """
         Navigate a FSM with uniform probability for each trigger at any state.
         The pure random approach.
 
         Returns:
-            int: length of the walk performed in order to meet the target coverage.
+            list: the (event, output) index pairs of the walk performed in order to meet
+            the target coverage.
         """
-        transitions_executed = set()
-        coverage = 0
-        state = self.mutated_fsm.machine.initial
-        walk = []
+        covered = bytearray(self._num_cells)
+        num_covered = 0
+        state = 0
+        walk = self._walk
+        coverage_steps = self._coverage_steps
 
-        while coverage < self.target_coverage:
+        while num_covered < self._coverage_threshold:
             if len(walk) > self.max_walk_length:
                 return -1
 
-            triggers = self.mutated_fsm._get_triggers(state)
-            trigger = random.choice(triggers)
+            event = self.rng.choice(self._events[state])
 
-            self.mutated_fsm.machine.trigger(trigger)
-            transitions_executed.add(f"{state}->{trigger}")
-            walk.append(trigger)
+            next_state, output = self._step(state, event)
+            walk.append((event, output))
+            cell = state * self._num_events + event
+            if not covered[cell]:
+                covered[cell] = 1
+                num_covered += 1
+                coverage_steps.append(len(walk))
 
-            state = self.mutated_fsm.machine.state
-            coverage = len(transitions_executed) / self.transitions_length * 100
+            state = next_state
 
         return walk
 
-    def detected_fault(self, mutated_walk: list[str]) -> int:
+    def detected_fault(
+        self, mutated_walk: list[tuple[int, int]], resets: list[int] = None
+    ) -> int:
         """
         Check whether walk detected fault in mutated FSM.
 
+        The mutated FSM shares the event and output indices of the original FSM, so the
+        walk can be replayed on the original FSM directly, restarting from the initial state
+        wherever the walk was reset.
+
         Args:
-            mutated_walk (list[str]): the walk performed on the mutated FSM.
+            mutated_walk (list[tuple[int, int]]): the (event, output) index pairs of the
+                walk performed on the mutated FSM.
+            resets (list[int]): the lengths of the walk at which it was reset to the initial
+                state. Defaults to the resets of the last walk performed if mutated_walk is that
+                walk, and to none otherwise.
 
         Returns:
             int: the index of the fault detected in the walk.
@@ -296,19 +480,30 @@ class RandomWalk:
         if mutated_walk == -1:
             return -1
 
-        mutated_walk_inputs = "".join(
-            [trigger.split(" / ")[0] for trigger in mutated_walk]
-        )
-        mutated_walk_outputs = tuple(
-            [trigger.split(" / ")[1] for trigger in mutated_walk]
-        )
-
-        _, outputs = self.original_fsm.apply_input_sequence(
-            self.original_fsm.machine.initial, mutated_walk_inputs
-        )
-
-        for index, output in enumerate(outputs):
-            if output != mutated_walk_outputs[index]:
+        if resets is None:
+            resets = self._resets if mutated_walk is self._walk else []
+
+        # Replay each part of the walk between resets from the initial state, in one batch
+        events = [event for event, _ in mutated_walk]
+        bounds = [0] + [reset for reset in resets if 0 < reset < len(events)]
+        bounds.append(len(events))
+        segments = [events[start:end] for start, end in zip(bounds, bounds[1:])]
+
+        sequences = np.full((len(segments), max(map(len, segments))), -1, np.int32)
+        for row, segment in enumerate(segments):
+            sequences[row, : len(segment)] = segment
+        _, outputs = self.original_fsm.apply_input_sequences(sequences, 0)
+
+        expected_outputs = [
+            output
+            for row, segment in enumerate(segments)
+            for output in outputs[row, : len(segment)].tolist()
+        ]
+
+        for index, (output, (_, mutated_output)) in enumerate(
+            zip(expected_outputs, mutated_walk)
+        ):
+            if output == -1 or output != mutated_output:
                 return index + 1
 
         return -1
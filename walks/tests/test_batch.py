@@ -0,0 +1,79 @@
+import random
+
+import numpy as np
+import pytest
+
+from fsm_gen.generator import FSMGenerator
+from fsm_gen.mutator import Mutator
+from walks.batch import BatchRandomWalk
+from walks.random_walk import RandomWalk
+
+
+def build_chain_fsm(first_output: str) -> FSMGenerator:
+    """Build a FSM with a single event that walks S0 -> S1 -> S2 and loops on S2"""
+    fsm = FSMGenerator(num_states=3, num_inputs=1, num_outputs=2)
+    fsm.states = ["S0", "S1", "S2"]
+    fsm.events = ["a"]
+    fsm.outputs = ["0", "1"]
+    fsm.transitions = [
+        {"source": "S0", "trigger": f"a / {first_output}", "dest": "S1"},
+        {"source": "S1", "trigger": "a / 1", "dest": "S2"},
+        {"source": "S2", "trigger": "a / 1", "dest": "S2"},
+    ]
+    return fsm
+
+
+def test_walk_lengths_for_each_target():
+    """Test that every walker records the step it reaches each target coverage on"""
+    fsm = build_chain_fsm("0")
+    batch = BatchRandomWalk(fsm, fsm, [0, 30, 50, 100, 150])
+    results = batch.walk(5)
+
+    # 30% and 50% of 3 transitions need 1 and 2 transitions, 150% is capped at 100%
+    assert (results["walk_lengths"] == [0, 1, 2, 3, 3]).all()
+    assert (results["detected_fault_index"] == -1).all()
+
+
+def test_detected_fault_index():
+    """Test that a fault is only reported for targets whose walk reaches it"""
+    results = BatchRandomWalk(
+        build_chain_fsm("1"), build_chain_fsm("0"), [0, 50, 100]
+    ).walk(3)
+    assert (results["detected_fault_index"] == [-1, 1, 1]).all()
+
+
+def test_max_walk_length_exceeded():
+    """Test that walks that exceed the maximum walk length are recorded as -1"""
+    fsm = build_chain_fsm("0")
+    batch = BatchRandomWalk(fsm, fsm, [50, 100])
+    batch.max_walk_length = 1
+    results = batch.walk(4)
+    assert (results["walk_lengths"] == [2, -1]).all()
+    assert (results["detected_fault_index"] == -1).all()
+
+
+def test_matches_random_walk_distribution():
+    """Test that the batch walks have the same length distribution as the RANDOM walk"""
+    fsm = FSMGenerator(6, 2, 2, exact_size=True, rng=random.Random(0))
+    mutated_fsm = Mutator(fsm, rng=random.Random(0)).create_mutated_fsm()
+
+    results = BatchRandomWalk(
+        fsm, mutated_fsm, [90], rng=np.random.default_rng(0)
+    ).walk(2000)
+    batch_lengths = results["walk_lengths"][:, 0]
+
+    walks = [
+        RandomWalk(fsm, mutated_fsm, 90, {}, rng=random.Random(seed)).walk(
+            RandomWalk.WalkType.RANDOM
+        )
+        for seed in range(500)
+    ]
+    lengths = np.array([len(walk) if walk != -1 else -1 for walk in walks])
+
+    # Compare the walks that reached the target and the share that exceeded the maximum length
+    assert batch_lengths[batch_lengths != -1].mean() == pytest.approx(
+        lengths[lengths != -1].mean(), rel=0.1
+    )
+    assert (batch_lengths == -1).mean() == pytest.approx(
+        (lengths == -1).mean(), abs=0.05
+    )
@@ -0,0 +1,80 @@
+import random
+
+from fsm_gen.generator import FSMGenerator
+import walks.cache
+from walks.cache import HSICache, fsm_hash
+from walks.hsi import generate_harmonised_state_identifiers, generate_HSI_suite
+
+
+def build_fsm(seed: int) -> FSMGenerator:
+    """Generate a small FSM from a seed"""
+    return FSMGenerator(4, 2, 2, exact_size=True, rng=random.Random(seed))
+
+
+def test_fsm_hash():
+    """Ensure machines with the same table share a hash and different tables do not"""
+    fsm = build_fsm(0)
+    assert fsm_hash(fsm) == fsm_hash(build_fsm(0))
+    assert fsm_hash(fsm) != fsm_hash(build_fsm(1))
+
+    # Renaming states does not change the artefacts, so it does not change the hash
+    fsm.states = [f"T{i}" for i in range(len(fsm.states))]
+    assert fsm_hash(fsm) == fsm_hash(build_fsm(0))
+
+
+def test_cache_reuses_artefacts():
+    """Ensure artefacts are generated once per table and match generating them directly"""
+    fsm = build_fsm(0)
+    cache = HSICache()
+    artefacts = cache.get(fsm)
+
+    identifiers = generate_harmonised_state_identifiers(fsm)
+    assert artefacts["state_identifiers"] == identifiers
+    assert artefacts["hsi_suite"] == generate_HSI_suite(fsm, identifiers)
+    assert cache.get(build_fsm(0)) is artefacts
+
+
+def test_cache_generates_artefacts_lazily(monkeypatch):
+    """Ensure the state identifiers alone do not generate the suite, and covers are built once"""
+    calls = []
+    generate_state_cover = walks.cache._generate_state_cover
+    monkeypatch.setattr(
+        walks.cache,
+        "_generate_state_cover",
+        lambda fsm: calls.append(fsm) or generate_state_cover(fsm),
+    )
+
+    fsm = build_fsm(0)
+    cache = HSICache()
+    identifiers = cache.get_state_identifiers(fsm)
+    assert identifiers == generate_harmonised_state_identifiers(fsm)
+    assert "hsi_suite" not in cache._artefacts[fsm_hash(fsm)]
+    assert calls == []
+
+    artefacts = cache.get(fsm)
+    assert artefacts["state_identifiers"] is identifiers
+    assert artefacts["hsi_suite"] == generate_HSI_suite(fsm, identifiers)
+    assert len(calls) == 1
+
+
+def test_cache_evicts_least_recently_used():
+    """Ensure the cache keeps at most max_size machines, dropping the least recently used"""
+    cache = HSICache(max_size=2)
+    first = cache.get(build_fsm(0))
+    cache.get(build_fsm(1))
+    assert cache.get(build_fsm(0)) is first
+
+    cache.get(build_fsm(2))
+    assert cache.get(build_fsm(0)) is first
+    assert fsm_hash(build_fsm(1)) not in cache._artefacts
+
+
+def test_cache_on_disk(tmp_path):
+    """Ensure artefacts written to disk are loaded by a new cache"""
+    fsm = build_fsm(0)
+    artefacts = HSICache(directory=str(tmp_path)).get(fsm)
+    assert (tmp_path / f"{fsm_hash(fsm)}.pkl").exists()
+
+    loaded = HSICache(directory=str(tmp_path)).get(fsm)
+    assert loaded is not artefacts
+    assert loaded == artefacts
@@ -0,0 +1,82 @@
+import random
+
+import numpy as np
+import pytest
+
+from fsm_gen.case_studies import LocalisationSystem
+from fsm_gen.equivalence import are_equivalent
+from fsm_gen.generator import FSMGenerator
+from fsm_gen.mutator import Mutator
+from walks.conformance import TEST_SUITE_GENERATORS, HSIMethod, TestSuiteGenerator
+from walks.hsi import generate_harmonised_state_identifiers, generate_HSI_suite
+
+
+def passes(fsm: FSMGenerator, suite: dict) -> bool:
+    """Check whether a FSM produces the expected outputs of every sequence in a suite"""
+    sequences = list(suite)
+    padded = np.full((len(sequences), max(map(len, sequences))), -1, np.int32)
+    for row, sequence in enumerate(sequences):
+        padded[row, : len(sequence)] = sequence
+    _, outputs = fsm.apply_input_sequences(padded, 0)
+    return all(
+        tuple(outputs[row, : len(sequence)].tolist()) == suite[sequence]
+        for row, sequence in enumerate(sequences)
+    )
+
+
+@pytest.mark.parametrize(
+    "generator", TEST_SUITE_GENERATORS, ids=lambda generator: generator.name
+)
+def test_report(generator: TestSuiteGenerator):
+    """Ensure the report measures the suite, which the FSM itself passes"""
+    fsm = LocalisationSystem()
+    report = generator.report(fsm)
+    suite = report["suite"]
+
+    assert report["method"] == generator.name
+    assert report["size"] == len(suite)
+    assert report["total_length"] == sum(len(seq) for seq in suite)
+    assert report["time_taken"].total_seconds() >= 0
+    assert passes(fsm, suite)
+    for seq in suite:
+        assert not any(other != seq and other[: len(seq)] == seq for other in suite)
+
+
+@pytest.mark.parametrize(
+    "generator", TEST_SUITE_GENERATORS, ids=lambda generator: generator.name
+)
+def test_detects_single_faults(generator: TestSuiteGenerator):
+    """Ensure every suite detects every output and transfer fault that changes behaviour"""
+    for seed in range(5):
+        fsm = FSMGenerator(5, 2, 2, exact_size=True, rng=random.Random(seed))
+        suite = generator.generate(fsm)
+        mutator = Mutator(fsm)
+        faults = list(mutator.output_faults()) + list(mutator.transfer_faults())
+
+        for mutant in mutator.stream_mutants(faults):
+            assert passes(mutant, suite) == are_equivalent(fsm, mutant)
+
+
+def test_suites_are_no_longer_than_w():
+    """Ensure the refinements of the W method produce no longer a suite for a typical FSM"""
+    fsm = FSMGenerator(10, 3, 3, exact_size=True, rng=random.Random(0))
+    reports = {
+        generator.name: generator.report(fsm) for generator in TEST_SUITE_GENERATORS
+    }
+    for name in ["Wp", "H", "SPY"]:
+        assert reports[name]["total_length"] <= reports["W"]["total_length"]
+
+
+def test_hsi_method_matches_hsi_suite():
+    """Ensure the HSI method generates the same suite as the random walk experiments use"""
+    for seed in range(5):
+        fsm = FSMGenerator(8, 3, 3, exact_size=True, rng=random.Random(seed))
+        assert HSIMethod().generate(fsm) == generate_HSI_suite(
+            fsm, generate_harmonised_state_identifiers(fsm)
+        )
+
+
+def test_generator_must_build_trie():
+    """Ensure a method that does not choose its sequences cannot be created"""
+    with pytest.raises(TypeError):
+        TestSuiteGenerator()
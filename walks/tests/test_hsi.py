@@ -1,9 +1,9 @@
 import pytest
 
 from fsm_gen.generator import FSMGenerator
-from fsm_gen.machine import Machine
 from walks.hsi import (
     _find_shortest_path,
+    _separating_sequences,
     _generate_state_cover,
     _generate_transition_cover,
     generate_harmonised_state_identifiers,
@@ -25,26 +25,17 @@ def fsm():
         {"source": "S2", "trigger": "a / z", "dest": "S0"},
     ]
 
-    # Ensure the FSM machine instance is recreated with these values
-    fsm.machine = fsm.machine = Machine(
-        states=fsm.states,
-        initial=fsm.states[0],
-        graph_engine="pygraphviz",
-        auto_transitions=False,
-        transitions=fsm.transitions,
-    )
-
     return fsm
 
 
 def test_find_shortest_path(fsm: FSMGenerator):
     """Ensure a valid list is returned and the path is correct"""
-    assert _find_shortest_path(fsm, "S2") == ["a", "b"]
-    assert _find_shortest_path(fsm, "S1") == ["a"]
-    assert _find_shortest_path(fsm, "S0") == []
-    path = _find_shortest_path(fsm, "S2")
+    assert _find_shortest_path(fsm, 2) == [0, 1]
+    assert _find_shortest_path(fsm, 1) == [0]
+    assert _find_shortest_path(fsm, 0) == []
+    path = _find_shortest_path(fsm, 2)
     assert isinstance(path, list)
-    assert all(isinstance(event, str) for event in path)
+    assert all(isinstance(event, int) for event in path)
 
 
 def test_generate_state_cover(fsm: FSMGenerator):
@@ -55,23 +46,23 @@ def test_generate_state_cover(fsm: FSMGenerator):
     for path in state_cover.values():
         assert isinstance(path, list)  # all values should be lists
         assert all(
-            isinstance(event, str) for event in path
-        )  # all elements should be strings
+            isinstance(event, int) for event in path
+        )  # all elements should be event indices
     # make sure a correct state cover is returned
-    assert state_cover == {"S0": [], "S1": ["a"], "S2": ["a", "b"]}
+    assert state_cover == {0: [], 1: [0], 2: [0, 1]}
 
 
 def test_generate_transition_cover(fsm: FSMGenerator):
     """Ensure a valid non-empty set is returned"""
-    transition_cover = _generate_transition_cover(fsm)
+    transition_cover = _generate_transition_cover(fsm, _generate_state_cover(fsm))
     # make sure structure is correct
     assert isinstance(transition_cover, set)  # the transition cover should be a set
     assert len(transition_cover) > 0  # the transition cover should not be empty
     assert all(
-        isinstance(seq, str) for seq in transition_cover
-    )  # all elements should be strings
+        isinstance(seq, tuple) for seq in transition_cover
+    )  # all elements should be tuples of event indices
     # ensuring the correct transition cover is returned
-    assert transition_cover == {"a", "ab", "aba"}
+    assert transition_cover == {(0,), (0, 1), (0, 1, 0)}
 
 
 def test_compute_h_sets(fsm: FSMGenerator):
@@ -80,10 +71,10 @@ def test_compute_h_sets(fsm: FSMGenerator):
     # make sure the structure is correct
     assert isinstance(h_sets, dict)
     assert len(h_sets) > 0
-    assert set(h_sets.keys()).issubset(fsm.states)  # states
+    assert set(h_sets.keys()).issubset(range(len(fsm.states)))  # states
     for path in h_sets.values():
         assert isinstance(path, set)
-        assert all(isinstance(event, str) for event in path)
+        assert all(isinstance(seq, tuple) for seq in path)
 
 
 def test_compute_h_sets_edge_cases():
@@ -95,13 +86,6 @@ def test_compute_h_sets_edge_cases():
         {"source": "S0", "trigger": "a / x", "dest": "S1"},
         {"source": "S1", "trigger": "a / x", "dest": "S0"},
     ]
-    fsm.machine = Machine(
-        states=fsm.states,
-        initial="S0",
-        graph_engine="pygraphviz",
-        auto_transitions=False,
-        transitions=fsm.transitions,
-    )
     h_sets = generate_harmonised_state_identifiers(fsm)
     for h in h_sets.values():
         assert isinstance(h, set)
@@ -114,7 +98,8 @@ def test_generate_HSI_suite(fsm: FSMGenerator):
     assert isinstance(hsi_suite, dict)
     assert len(hsi_suite) > 0
     for seq, output in hsi_suite.items():
-        assert isinstance(seq, str)
+        assert isinstance(seq, tuple)
+        assert len(output) == len(seq)
 
 
 def test_generate_HSI_suite_empty():
@@ -123,14 +108,86 @@ def test_generate_HSI_suite_empty():
     fsm.states = ["S0"]
     fsm.events = ["a"]
     fsm.transitions = []
-    fsm.machine = Machine(
-        states=fsm.states,
-        initial="S0",
-        graph_engine="pygraphviz",
-        auto_transitions=False,
-        transitions=fsm.transitions,
-    )
     identifiers = generate_harmonised_state_identifiers(fsm)
     hsi_suite = generate_HSI_suite(fsm, identifiers)
     assert isinstance(hsi_suite, dict)
     assert list(hsi_suite.keys()) == []
+
+
+def test_generate_HSI_suite_multi_character_events():
+    """Test the HSI suite with event names that are prefixes of each other"""
+    fsm = FSMGenerator(num_states=2, num_inputs=2, num_outputs=2)
+    fsm.states = ["S0", "S1"]
+    fsm.events = ["on", "onoff"]
+    fsm.outputs = ["0", "1"]
+    fsm.transitions = [
+        {"source": "S0", "trigger": "on / 0", "dest": "S1"},
+        {"source": "S0", "trigger": "onoff / 0", "dest": "S0"},
+        {"source": "S1", "trigger": "on / 1", "dest": "S0"},
+        {"source": "S1", "trigger": "onoff / 0", "dest": "S1"},
+    ]
+    identifiers = generate_harmonised_state_identifiers(fsm)
+    assert identifiers == {0: {(0,)}, 1: {(0,)}}
+
+    hsi_suite = generate_HSI_suite(fsm, identifiers)
+    for seq, output in hsi_suite.items():
+        _, expected = fsm.apply_input_sequence("S0", [fsm.events[e] for e in seq])
+        assert tuple(fsm.outputs[o] for o in output) == expected
+
+
+def test_separating_sequences_longer_than_five():
+    """Test that states separated only by a long sequence are still told apart"""
+    fsm = FSMGenerator(num_states=8, num_inputs=1, num_outputs=2)
+    fsm.states = [f"S{i}" for i in range(8)]
+    fsm.events = ["a"]
+    fsm.outputs = ["0", "1"]
+    fsm.transitions = [
+        {"source": f"S{i}", "trigger": "a / 0", "dest": f"S{i + 1}"} for i in range(7)
+    ] + [{"source": "S7", "trigger": "a / 1", "dest": "S7"}]
+
+    separating_sequences = _separating_sequences(fsm)
+    assert len(separating_sequences) == 28
+    assert separating_sequences[(0, 1)] == (0,) * 7
+    for (s1, s2), seq in separating_sequences.items():
+        assert len(seq) == 7 - s2 + 1
+        _, outputs = fsm.apply_input_sequences([seq, seq], [s1, s2])
+        assert (outputs[0] != outputs[1]).any()
+
+    identifiers = generate_harmonised_state_identifiers(fsm)
+    assert (0,) * 7 in identifiers[0]
+
+
+def test_generate_HSI_suite_keeps_maximal_sequences(fsm: FSMGenerator):
+    """Ensure no sequence in the HSI suite is a prefix of another"""
+    identifiers = {0: {(0,), (0, 1)}, 1: {(1,)}}
+    hsi_suite = generate_HSI_suite(fsm, identifiers)
+    sequences = list(hsi_suite)
+    for seq in sequences:
+        assert not any(other != seq and other[: len(seq)] == seq for other in sequences)
+    # (0, 1) from the initial state is a prefix of (0, 1, 0, 1) and must be dropped
+    assert (0, 1) not in hsi_suite
+    output = hsi_suite[(0, 1, 0, 1)]
+    assert [fsm.outputs[o] for o in output[:3]] == ["x", "y", "z"]
+    assert output[3] == -1
+
+
+def test_generate_state_cover_unreachable_state(fsm: FSMGenerator):
+    """Ensure unreachable states are left out of the state and transition covers"""
+    fsm.transitions = fsm.transitions[:1] + [
+        {"source": "S2", "trigger": "a / z", "dest": "S1"}
+    ]
+    assert _find_shortest_path(fsm, 2) is None
+    state_cover = _generate_state_cover(fsm)
+    assert state_cover == {0: [], 1: [0]}
+    assert _generate_transition_cover(fsm, state_cover) == {(0,)}
+
+
+def test_generate_state_cover_large_machine():
+    """Ensure every state of a large cyclic machine is covered by a shortest path"""
+    fsm = FSMGenerator(num_states=300, num_inputs=3, num_outputs=2)
+    state_cover = _generate_state_cover(fsm)
+    assert len(state_cover) == len(fsm.states)
+    for state, path in state_cover.items():
+        final_state, _ = fsm.apply_input_sequences([path], 0)
+        assert final_state[0] == state
+        assert len(path) < len(fsm.states)
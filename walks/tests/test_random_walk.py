@@ -1,57 +1,62 @@
+import random
+from collections import OrderedDict
 from typing import Any
-from unittest.mock import MagicMock
 
 import pytest
 
+from fsm_gen.equivalence import are_equivalent
 from fsm_gen.generator import FSMGenerator
-from fsm_gen.machine import Machine
 from fsm_gen.mutator import Mutator
+from fsm_gen.overlay import TableOverlay
+from walks.hsi import generate_harmonised_state_identifiers, generate_HSI_suite
 from walks.random_walk import RandomWalk
 
 
-@pytest.fixture
-def simple_fsm():
-    fsm = MagicMock(spec=FSMGenerator)
-    mock_machine = MagicMock()
-    mock_machine.initial = "S0"
-    mock_machine.state = "S0"
-
-    # Mock triggers and transitions
-    fsm._get_triggers.return_value = ["a", "b", "c"]
-    fsm.machine = mock_machine
-    fsm.events = ["a", "b", "c"]
-    fsm.transitions = [
-        {"source": "S0", "trigger": "a", "dest": "S1"},
-        {"source": "S1", "trigger": "b", "dest": "S2"},
-        {"source": "S2", "trigger": "c", "dest": "S0"},
-    ]
+def build_fsm(transitions: list[dict]) -> FSMGenerator:
+    """Build a FSM over states S0-S2, events a-c and outputs 0/1 with the given transitions"""
+    fsm = FSMGenerator(num_states=3, num_inputs=3, num_outputs=2)
+
+    # Manually override states, events, outputs and transitions
     fsm.states = ["S0", "S1", "S2"]
-    fsm.apply_input_sequence = MagicMock(
-        side_effect=lambda state, seq: (state, tuple("0" for _ in seq))
-    )
+    fsm.events = ["a", "b", "c"]
+    fsm.outputs = ["0", "1"]
+    fsm.transitions = transitions
 
     return fsm
 
 
 @pytest.fixture
-def mutated_fsm2():
-    fsm = MagicMock(spec=FSMGenerator)
-    mock_machine = MagicMock()
-    mock_machine.initial = "S0"
-    mock_machine.state = "S0"
-
-    # Mock triggers and transitions
-    fsm.machine = mock_machine
-    fsm.events = ["a", "b", "c"]
-    fsm.transitions = [
-        {"source": "S0", "trigger": "a", "dest": "S1"},
-        {"source": "S1", "trigger": "b", "dest": "S2"},
-        {"source": "S2", "trigger": "c", "dest": "S0"},
-    ]
-    fsm.states = ["S0", "S1", "S2"]
+def simple_fsm():
+    return build_fsm(
+        [
+            {"source": "S0", "trigger": "a / 0", "dest": "S1"},
+            {"source": "S0", "trigger": "b / 0", "dest": "S0"},
+            {"source": "S0", "trigger": "c / 1", "dest": "S2"},
+            {"source": "S1", "trigger": "a / 1", "dest": "S2"},
+            {"source": "S1", "trigger": "b / 1", "dest": "S0"},
+            {"source": "S1", "trigger": "c / 0", "dest": "S1"},
+            {"source": "S2", "trigger": "a / 0", "dest": "S0"},
+            {"source": "S2", "trigger": "b / 1", "dest": "S2"},
+            {"source": "S2", "trigger": "c / 1", "dest": "S1"},
+        ]
+    )
+
+
+@pytest.fixture
+def original_fsm():
+    return build_fsm(
+        [
+            {"source": "S0", "trigger": "a / 0", "dest": "S1"},
+            {"source": "S1", "trigger": "b / 1", "dest": "S2"},
+            {"source": "S2", "trigger": "c / 1", "dest": "S0"},
+        ]
+    )
 
+
+@pytest.fixture
+def mutated_fsm2(simple_fsm: FSMGenerator):
     # Apply mutations using the Mutator
-    mutator = Mutator(fsm)
+    mutator = Mutator(simple_fsm, rng=random.Random(0))
     mutated_fsm2 = mutator.create_mutated_fsm()
 
     return mutated_fsm2
@@ -59,77 +64,63 @@ def mutated_fsm2():
 
 @pytest.fixture
 def mutated_fsm1():
-    mutated_fsm1 = MagicMock(spec=FSMGenerator)
-    mock_machine = MagicMock()
-    mock_machine.initial = "S0"
-    mock_machine.state = "S0"
-
-    # Mock triggers and transitions
-    mutated_fsm1.events = ["a", "b", "c"]
-    mutated_fsm1._get_triggers.return_value = ["a", "b", "c"]
-    mutated_fsm1.machine = mock_machine
-    mutated_fsm1.transitions = [
-        {"source": "S0", "trigger": "a", "dest": "S1"},
-        {"source": "S1", "trigger": "a", "dest": "S2"},
-        {"source": "S2", "trigger": "c", "dest": "S0"},
-    ]
-
-    return mutated_fsm1
+    return build_fsm(
+        [
+            {"source": "S0", "trigger": "a / 0", "dest": "S1"},
+            {"source": "S0", "trigger": "b / 0", "dest": "S0"},
+            {"source": "S0", "trigger": "c / 1", "dest": "S2"},
+            {"source": "S1", "trigger": "a / 1", "dest": "S2"},
+            {"source": "S1", "trigger": "b / 0", "dest": "S0"},
+            {"source": "S1", "trigger": "c / 0", "dest": "S1"},
+            {"source": "S2", "trigger": "a / 0", "dest": "S0"},
+            {"source": "S2", "trigger": "b / 1", "dest": "S2"},
+            {"source": "S2", "trigger": "c / 1", "dest": "S1"},
+        ]
+    )
 
 
 @pytest.fixture
 def loop_fsm():
-    mock_fsm = MagicMock(spec=FSMGenerator)
-    mock_machine = MagicMock()
-    mock_machine.initial = "S0"
-    mock_machine.state = "S0"
-
-    # Mock triggers and transitions
-    mock_fsm._get_triggers.return_value = ["a", "b", "c"]
-    mock_fsm.machine = mock_machine
-    mock_fsm.events = ["a", "b", "c"]
-    mock_fsm.transitions = [
-        {"source": "S0", "trigger": "a", "dest": "S1"},
-        {"source": "S1", "trigger": "b", "dest": "S0"},
-        {"source": "S1", "trigger": "a", "dest": "S2"},
-        {"source": "S2", "trigger": "c", "dest": "S1"},
-    ]
-    mock_fsm.states = ["S0", "S1", "S2"]
-
-    return mock_fsm
+    return build_fsm(
+        [
+            {"source": "S0", "trigger": "a / 0", "dest": "S1"},
+            {"source": "S0", "trigger": "b / 0", "dest": "S0"},
+            {"source": "S1", "trigger": "b / 1", "dest": "S0"},
+            {"source": "S1", "trigger": "a / 0", "dest": "S2"},
+            {"source": "S2", "trigger": "c / 1", "dest": "S1"},
+            {"source": "S2", "trigger": "a / 1", "dest": "S2"},
+        ]
+    )
 
 
 @pytest.fixture
 def loop_fsm_mutated():
-    mock_fsm = MagicMock(spec=FSMGenerator)
-    mock_machine = MagicMock()
-    mock_machine.initial = "S0"
-    mock_machine.state = "S0"
-
-    # Mock triggers and transitions
-    mock_fsm._get_triggers.return_value = ["a", "b", "c"]
-    mock_fsm.events = ["a", "b", "c"]
-    mock_fsm.machine = mock_machine
-    mock_fsm.transitions = [
-        {"source": "S0", "trigger": "a", "dest": "S1"},
-        {"source": "S1", "trigger": "b", "dest": "S0"},
-        {"source": "S1", "trigger": "a", "dest": "S2"},
-        {"source": "S2", "trigger": "b", "dest": "S1"},
-    ]
-
-    return mock_fsm
+    return build_fsm(
+        [
+            {"source": "S0", "trigger": "a / 0", "dest": "S1"},
+            {"source": "S0", "trigger": "b / 0", "dest": "S0"},
+            {"source": "S1", "trigger": "b / 1", "dest": "S0"},
+            {"source": "S1", "trigger": "a / 0", "dest": "S2"},
+            {"source": "S2", "trigger": "b / 1", "dest": "S1"},
+            {"source": "S2", "trigger": "a / 1", "dest": "S2"},
+        ]
+    )
 
 
 @pytest.fixture
 def sample_hsi_suite():
-    return {"a": ("0",), "ab": ("0", "1"), "abc": ("0", "1", "0")}
+    return {(0,): (0,), (0, 1): (0, 1), (0, 1, 2): (0, 1, 0)}
 
 
 @pytest.fixture
 def random_walk(
-    simple_fsm: MagicMock, mutated_fsm1: MagicMock, sample_hsi_suite: dict[str, Any]
+    simple_fsm: FSMGenerator,
+    mutated_fsm1: FSMGenerator,
+    sample_hsi_suite: dict[str, Any],
 ):
-    return RandomWalk(simple_fsm, mutated_fsm1, 70, sample_hsi_suite)
+    return RandomWalk(
+        simple_fsm, mutated_fsm1, 70, sample_hsi_suite, rng=random.Random(0)
+    )
 
 
 def test_random_walk(random_walk: RandomWalk):
@@ -139,7 +130,9 @@ def test_random_walk(random_walk: RandomWalk):
 
 
 def test_random_walk_no_coverage(
-    simple_fsm: MagicMock, mutated_fsm1: MagicMock, sample_hsi_suite: dict[str, Any]
+    simple_fsm: FSMGenerator,
+    mutated_fsm1: FSMGenerator,
+    sample_hsi_suite: dict[str, Any],
 ):
     """Tests that the random walk doesnt walk if target coverage is 0"""
     random_walk = RandomWalk(simple_fsm, mutated_fsm1, 0, sample_hsi_suite)
@@ -148,10 +141,14 @@ def test_random_walk_no_coverage(
 
 
 def test_random_walk_loop(
-    loop_fsm: MagicMock, sample_hsi_suite: dict[str, Any], loop_fsm_mutated: MagicMock
+    loop_fsm: FSMGenerator,
+    sample_hsi_suite: dict[str, Any],
+    loop_fsm_mutated: FSMGenerator,
 ):
     """Test that it doesnt get stuck in a loop"""
-    random_walk = RandomWalk(loop_fsm, loop_fsm_mutated, 60, sample_hsi_suite)
+    random_walk = RandomWalk(
+        loop_fsm, loop_fsm_mutated, 60, sample_hsi_suite, rng=random.Random(0)
+    )
     walk = random_walk.walk(RandomWalk.WalkType.RANDOM)
     assert len(walk) > 0
     assert len(walk) < 100  # Should not be too long/ no infinite loop
@@ -166,32 +163,38 @@ def test_random_walk_max_length_exceeded(random_walk: RandomWalk):
     assert walk == -1
 
 
-def test_detected_fault(simple_fsm: MagicMock, mutated_fsm1: MagicMock):
+def test_detected_fault(original_fsm: FSMGenerator, mutated_fsm1: FSMGenerator):
     """Test that the detected_fault method identifies faults correctly."""
-    random_walk = RandomWalk(simple_fsm, mutated_fsm1, 100, {})
-    mutated_walk = ["a / 0", "b / 1", "c / 0"]
-    simple_fsm.apply_input_sequence = MagicMock(return_value=(None, ("0", "1", "1")))
+    random_walk = RandomWalk(original_fsm, mutated_fsm1, 100, {})
+    mutated_walk = [(0, 0), (1, 1), (2, 0)]
     fault_index = random_walk.detected_fault(mutated_walk)
     # detect the fault at correct index
     assert fault_index == 3
 
 
-def test_detected_fault_no_fault(simple_fsm: MagicMock, mutated_fsm1: MagicMock):
+def test_detected_fault_no_fault(
+    original_fsm: FSMGenerator, mutated_fsm1: FSMGenerator
+):
     """Test that the detected_fault method returns -1 if no fault is found."""
-    random_walk = RandomWalk(simple_fsm, mutated_fsm1, 100, {})
-    mutated_walk = ["a / 0", "b / 1", "c / 0"]
-    simple_fsm.apply_input_sequence = MagicMock(return_value=(None, ("0", "1", "0")))
+    random_walk = RandomWalk(original_fsm, mutated_fsm1, 100, {})
+    mutated_walk = [(0, 0), (1, 1), (2, 1)]
     fault_index = random_walk.detected_fault(mutated_walk)
     assert fault_index == -1
 
 
 def test_random_walk_reaches_target_coverage(
-    simple_fsm: MagicMock, mutated_fsm1: MagicMock, sample_hsi_suite: dict[str, Any]
+    simple_fsm: FSMGenerator,
+    mutated_fsm1: FSMGenerator,
+    sample_hsi_suite: dict[str, Any],
 ):
     """Test that the random walk reaches the target coverage."""
     target_coverage = 100
     random_walk = RandomWalk(
-        simple_fsm, mutated_fsm1, target_coverage, sample_hsi_suite
+        simple_fsm,
+        mutated_fsm1,
+        target_coverage,
+        sample_hsi_suite,
+        rng=random.Random(0),
     )
     walk = random_walk.walk(RandomWalk.WalkType.RANDOM)
     assert len(walk) > 0
@@ -199,7 +202,9 @@ def test_random_walk_reaches_target_coverage(
 
 
 def test_random_reset_walk_doesnt_walk_with_no_coverage(
-    simple_fsm: MagicMock, mutated_fsm1: MagicMock, sample_hsi_suite: dict[str, Any]
+    simple_fsm: FSMGenerator,
+    mutated_fsm1: FSMGenerator,
+    sample_hsi_suite: dict[str, Any],
 ):
     """Tests that the walk doesnt walk if target coverage is 0"""
     random_walk = RandomWalk(simple_fsm, mutated_fsm1, 0, sample_hsi_suite)
@@ -207,26 +212,23 @@ def test_random_reset_walk_doesnt_walk_with_no_coverage(
     assert len(walk) == 0
 
 
-def test_random_walk_with_empty_triggers(mutated_fsm1: MagicMock):
+def test_random_walk_with_empty_triggers():
     """Test that the random walk raises an error if there are no triggers."""
-    mock_fsm = MagicMock(spec=FSMGenerator)
-    mock_fsm.machine = MagicMock()
-    mock_fsm.initial = "S0"
-    mock_fsm.state = "S0"
-    mock_fsm.transitions = []
-    mock_fsm._get_triggers = MagicMock(return_value=[])
-    mock_fsm.states = ["S0", "S1", "S2"]
-    mock_fsm.events = ["a", "b", "c"]
-    walk = RandomWalk(mock_fsm, mock_fsm, target_coverage=100, HSI_suite={})
+    fsm = build_fsm([])
+    walk = RandomWalk(fsm, fsm, target_coverage=100, HSI_suite={})
     with pytest.raises(IndexError):
         walk.walk(RandomWalk.WalkType.RANDOM)
 
 
 def test_impossible_coverage(
-    simple_fsm: MagicMock, mutated_fsm1: MagicMock, sample_hsi_suite: dict[str, Any]
+    simple_fsm: FSMGenerator,
+    mutated_fsm1: FSMGenerator,
+    sample_hsi_suite: dict[str, Any],
 ):
     """Test a random walk with a target coverage that is impossible"""
-    random_walk = RandomWalk(simple_fsm, mutated_fsm1, 200, sample_hsi_suite)
+    random_walk = RandomWalk(
+        simple_fsm, mutated_fsm1, 200, sample_hsi_suite, rng=random.Random(0)
+    )
     walk = random_walk.walk(RandomWalk.WalkType.RANDOM)
     assert len(walk) > 0
     assert random_walk.target_coverage == 100
@@ -240,7 +242,9 @@ def test_statistical_walk(random_walk: RandomWalk):
 
 
 def test_statistical_walk_no_coverage(
-    simple_fsm: MagicMock, mutated_fsm1: MagicMock, sample_hsi_suite: dict[str, Any]
+    simple_fsm: FSMGenerator,
+    mutated_fsm1: FSMGenerator,
+    sample_hsi_suite: dict[str, Any],
 ):
     """Tests that the statistical walk doesnt walk if target coverage is 0"""
     random_walk = RandomWalk(simple_fsm, mutated_fsm1, 0, sample_hsi_suite)
@@ -276,3 +280,236 @@ def test_limited_self_loop_walk_max_length_exceeded(random_walk: RandomWalk):
     walk = random_walk.walk(RandomWalk.WalkType.LIMITED_SELF_LOOP)
     # return -1 if max length exceeded
     assert walk == -1
+
+
+def test_walk_records_event_output_pairs(
+    random_walk: RandomWalk, mutated_fsm1: FSMGenerator
+):
+    """Test that the walk records the event and output indices fired on the mutated FSM"""
+    walk = random_walk.walk(RandomWalk.WalkType.RANDOM)
+    _, outputs = mutated_fsm1.apply_input_sequences([[event for event, _ in walk]], 0)
+    assert all(isinstance(event, int) for event, _ in walk)
+    assert [output for _, output in walk] == outputs[0].tolist()
+
+
+def test_statistical_walk_on_mutant_with_new_state(
+    simple_fsm: FSMGenerator, sample_hsi_suite: dict[str, Any]
+):
+    """Test the statistical walk on a mutant with a state the original FSM does not have"""
+    overlay = TableOverlay(simple_fsm)
+    new = overlay.add_state("S3")
+    overlay.set(2, 0, new, 0)
+    for event in range(overlay.num_events):
+        overlay.set(new, event, 0, 1)
+
+    random_walk = RandomWalk(
+        simple_fsm, overlay.materialise(), 50, sample_hsi_suite, rng=random.Random(0)
+    )
+    walk = random_walk.walk(RandomWalk.WalkType.STATISTICAL)
+    assert len(walk) > 0
+
+
+def test_walk_does_not_use_machine(
+    simple_fsm: FSMGenerator, sample_hsi_suite: dict[str, Any]
+):
+    """Test that walks step on the transition table without building the graph machine"""
+    fsm = build_fsm(simple_fsm.transitions)
+    assert fsm._machine is None
+
+    for walk_type in RandomWalk.WalkType:
+        random_walk = RandomWalk(fsm, fsm, 100, sample_hsi_suite, rng=random.Random(0))
+        random_walk.walk(walk_type)
+        random_walk.detected_fault(random_walk._walk)
+
+    assert fsm._machine is None
+
+
+@pytest.mark.parametrize(
+    "walk_type",
+    [
+        RandomWalk.WalkType.RANDOM,
+        RandomWalk.WalkType.LIMITED_SELF_LOOP,
+        RandomWalk.WalkType.STATISTICAL,
+    ],
+)
+def test_walk_stops_at_target_coverage(
+    walk_type: RandomWalk.WalkType,
+    simple_fsm: FSMGenerator,
+    sample_hsi_suite: dict[str, Any],
+):
+    """Test that walks stop on the step that covers ceil(target%) of the transitions"""
+    random_walk = RandomWalk(
+        simple_fsm, simple_fsm, 70, sample_hsi_suite, rng=random.Random(0)
+    )
+    walk = random_walk.walk(walk_type)
+
+    # 70% of the 9 transitions is 6.3, so 7 transitions must be covered
+    covered = set()
+    state = 0
+    for step, (event, _) in enumerate(walk):
+        covered.add((state, event))
+        state = int(simple_fsm.dest_table[state, event])
+        assert (len(covered) >= 7) == (step == len(walk) - 1)
+
+
+@pytest.fixture
+def chain_fsm():
+    return build_fsm(
+        [
+            {"source": "S0", "trigger": "a / 0", "dest": "S1"},
+            {"source": "S1", "trigger": "a / 1", "dest": "S2"},
+            {"source": "S2", "trigger": "a / 1", "dest": "S2"},
+        ]
+    )
+
+
+@pytest.mark.parametrize(
+    "hsi_suite, expected",
+    [
+        # The first step identifies the walk, so it never resets
+        ({(0,): (0,)}, 3),
+        ({(0, 0): (0, 1), (0, 0, 0): (0, 1, 1)}, 3),
+        # The walk is never identified and resets before reaching the last transition
+        ({}, -1),
+        ({(0,): (1,)}, -1),
+    ],
+)
+def test_random_walk_with_reset_identification(
+    chain_fsm: FSMGenerator, hsi_suite: dict, expected: int
+):
+    """Test that the reset walk only resets when the HSI suite does not identify it"""
+    random_walk = RandomWalk(chain_fsm, chain_fsm, 100, hsi_suite, rng=random.Random(0))
+    walk = random_walk.walk(RandomWalk.WalkType.RANDOM_WITH_RESET, step_limit=2)
+    assert (len(walk) if walk != -1 else -1) == expected
+
+
+def test_random_walk_with_reset_against_itself():
+    """Test that the reset walk of a FSM against itself never detects a fault"""
+    num_resets = 0
+    for seed in range(20):
+        fsm = FSMGenerator(10, 3, 3, exact_size=True, rng=random.Random(seed))
+        hsi_suite = generate_HSI_suite(fsm, generate_harmonised_state_identifiers(fsm))
+        random_walk = RandomWalk(fsm, fsm, 100, hsi_suite, rng=random.Random(seed))
+        walk = random_walk.walk(RandomWalk.WalkType.RANDOM_WITH_RESET, step_limit=2)
+
+        num_resets += len(random_walk._resets)
+        assert random_walk.detected_fault(walk) == -1
+
+    # The walks must actually reset for the check to mean anything
+    assert num_resets > 0
+
+
+def test_statistical_walk_builds_weights_once(random_walk: RandomWalk):
+    """Test that the cumulative event weights are built once and reused by later walks"""
+    random_walk.walk(RandomWalk.WalkType.STATISTICAL)
+    cumulative_weights = random_walk._cumulative_weights
+    random_walk.walk(RandomWalk.WalkType.STATISTICAL)
+    assert random_walk._cumulative_weights is cumulative_weights
+
+    for state, cumulative in enumerate(cumulative_weights):
+        assert len(cumulative) == len(random_walk._events[state])
+        assert cumulative == sorted(cumulative)
+        assert cumulative[-1] <= 1 + 1e-9
+
+
+def test_statistical_walk_shares_weights_between_walkers(monkeypatch):
+    """Test that walkers on mutants of the same FSM share the event weights of the FSM"""
+    monkeypatch.setattr("walks.random_walk._event_weights", OrderedDict())
+    calls = []
+    calculate_event_probabilities = RandomWalk._calculate_event_probabilities
+    monkeypatch.setattr(
+        RandomWalk,
+        "_calculate_event_probabilities",
+        lambda self: calls.append(self) or calculate_event_probabilities(self),
+    )
+
+    fsm = FSMGenerator(6, 2, 2, exact_size=True, rng=random.Random(0))
+    mutants = Mutator(fsm).generate_mutants(3, types=["change_trigger_output"], seed=0)
+    walkers = [
+        RandomWalk(fsm, mutant, 100, {}, rng=random.Random(0)) for mutant in mutants
+    ]
+    for walker in walkers:
+        walker.walk(RandomWalk.WalkType.STATISTICAL)
+
+    # Output faults keep the events of every state, so every state shares its weights
+    assert len(calls) == 1
+    for walker in walkers[1:]:
+        assert all(
+            weights is first
+            for weights, first in zip(
+                walker._cumulative_weights, walkers[0]._cumulative_weights
+            )
+        )
+
+
+@pytest.mark.parametrize("walk_type", list(RandomWalk.WalkType))
+def test_walk_milestones_match_separate_walks(
+    walk_type: RandomWalk.WalkType,
+    simple_fsm: FSMGenerator,
+    mutated_fsm2: FSMGenerator,
+    sample_hsi_suite: dict[str, Any],
+):
+    """Test that one walk records the same result at each target as walking to it separately"""
+    targets = [0, 50, 80, 90, 100]
+    for seed in range(10):
+        random_walk = RandomWalk(
+            simple_fsm, mutated_fsm2, targets, sample_hsi_suite, rng=random.Random(seed)
+        )
+        assert random_walk.target_coverage == 100
+        milestones = random_walk.walk_milestones(walk_type)
+        assert list(milestones) == targets
+
+        for target in targets:
+            separate = RandomWalk(
+                simple_fsm,
+                mutated_fsm2,
+                target,
+                sample_hsi_suite,
+                rng=random.Random(seed),
+            )
+            walk = separate.walk(walk_type)
+            assert milestones[target] == {
+                "walk_len": len(walk) if walk != -1 else -1,
+                "detected_fault_index": separate.detected_fault(walk),
+            }
+
+
+def test_walk_milestones_with_reset_on_equivalent_mutant():
+    """Test that the reset walk records no detection at any target on an equivalent mutant"""
+    num_resets = 0
+    num_reached = 0
+    for seed in range(10):
+        fsm = FSMGenerator(10, 3, 3, exact_size=True, rng=random.Random(seed))
+        hsi_suite = generate_HSI_suite(fsm, generate_harmonised_state_identifiers(fsm))
+
+        # Redirect the first transition to a copy of the state it reaches
+        overlay = TableOverlay(fsm)
+        event = overlay.events(0)[0]
+        dest = overlay.dest(0, event)
+        copy = overlay.add_state("copy")
+        for copied_event in overlay.events(dest):
+            overlay.set(
+                copy,
+                copied_event,
+                overlay.dest(dest, copied_event),
+                overlay.output(dest, copied_event),
+            )
+        overlay.set(0, event, copy, overlay.output(0, event))
+        mutant = overlay.materialise()
+        assert are_equivalent(fsm, mutant)
+
+        random_walk = RandomWalk(
+            fsm, mutant, [50, 80, 100], hsi_suite, rng=random.Random(seed)
+        )
+        milestones = random_walk.walk_milestones(
+            RandomWalk.WalkType.RANDOM_WITH_RESET, step_limit=2
+        )
+
+        num_resets += len(random_walk._resets)
+        for milestone in milestones.values():
+            num_reached += milestone["walk_len"] != -1
+            assert milestone["detected_fault_index"] == -1
+
+    # The walks must actually reset and reach the targets for the check to mean anything
+    assert num_resets > 0
+    assert num_reached > 0